@@ -0,0 +1,271 @@
+"""Benchmark the startup and render latency of every page.
+
+Generates a synthetic data directory for each scale, a multiple of the 713
+real films (see ``src/synthetic.py``), under ``--workdir`` where later runs
+reuse it. The steps of ``build.py`` then build what pages read but never
+compute, when missing: the metric tables, the Louvain partition and the
+null-model ensemble. Then, in a fresh interpreter per page with the in-memory result
+cache, it imports ``index`` and runs the page function headless, outside a
+Streamlit session: once with cold caches, recording the growth of peak
+resident memory, and once more warm, keeping the median of ``--repeats``
+runs. Another run per page traces the cold render's peak memory and the
+memory blocks it left allocated. Every step is
+stopped after ``--timeout`` seconds and recorded as a timeout.
+
+Results are written to ``--output`` and compared with ``--baseline`` when
+given, exiting with status 1 if any measurement regressed by more than
+``--tolerance``. Run from the repository root::
+
+    python benchmarks/pages.py --scales 1 10 100 --output pages.json
+    python benchmarks/pages.py --scales 1 --baseline pages.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Target measuring the import of ``index`` alone.
+STARTUP = "startup"
+# Offline steps run before any page, each in its own interpreter. Results
+# already stored in the data directory are loaded instead of rebuilt.
+SETUP = {
+    "generate": "synthetic.generate({scale!r}, {seed!r})",
+    "film_metrics": "build.build_metrics(datastore.FILM_NETWORK)",
+    "actor_metrics": "build.build_metrics(datastore.ACTOR_NETWORK)",
+    "partition": "build.build_partition()",
+    "ensemble": "build.build_ensemble()",
+}
+# Smallest changes reported as regressions, whatever the tolerance.
+FLOORS = {
+    "cold_s": 0.1,
+    "warm_s": 0.05,
+    "peak_bytes": 1 << 20,
+    "blocks": 1000,
+    "rss_kib": 1024,
+}
+
+_WORKER = """
+import json, logging, os, resource, sys, time, tracemalloc
+sys.path.insert(0, {src!r})
+logging.disable(logging.WARNING)
+target, mode = {target!r}, {mode!r}
+
+def render():
+    import index
+    if target != {startup!r}:
+        index.PAGES[target]()
+
+# Pages are measured on top of the startup imports.
+if target != {startup!r}:
+    import index
+if mode == "time":
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    render()
+    result = {{
+        "cold_s": time.perf_counter() - start,
+        "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss,
+    }}
+    if target != {startup!r}:
+        start = time.perf_counter()
+        render()
+        result["warm_s"] = time.perf_counter() - start
+else:
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    render()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result = {{
+        "peak_bytes": peak,
+        "blocks": sys.getallocatedblocks() - blocks,
+    }}
+print(json.dumps(result))
+"""
+
+
+def run(code, data_dir, timeout):
+    """Run ``code`` in a fresh interpreter reading data from ``data_dir``.
+
+    Returns:
+        dict: The JSON object the code printed last, or the ``status`` of a
+        run that timed out or failed.
+    """
+    env = dict(os.environ, APP_DATA=data_dir, APP_CACHE="memory:")
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=env,
+        )
+    except subprocess.TimeoutExpired:
+        return {"status": "timeout"}
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines() or ["no output"]
+        return {"status": "error", "error": lines[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def setup(data_dir, scale, seed, timeout):
+    """Generate and precompute the data of one scale, timing each step."""
+    steps = {}
+    for step, call in SETUP.items():
+        if step == "generate" and os.path.exists(
+            os.path.join(data_dir, "store", "tables")
+        ):
+            steps[step] = {"status": "reused"}
+            continue
+        code = (
+            f"import json, sys, time\nsys.path.insert(0, {SRC!r})\n"
+            "import build, datastore, synthetic\n"
+            "start = time.perf_counter()\n"
+            f"{call.format(scale=scale, seed=seed)}\n"
+            'print(json.dumps({"seconds": time.perf_counter() - start}))\n'
+        )
+        steps[step] = run(code, data_dir, timeout)
+        print(f"  setup {step:<14} {describe(steps[step], 'seconds')}")
+        if step == "generate" and "status" in steps[step]:
+            break
+    return steps
+
+
+def measure(data_dir, targets, timeout, repeats=3):
+    """Return the time and memory measurements of every target.
+
+    The timing run is repeated ``repeats`` times, keeping the median of
+    each measurement.
+    """
+    results = {}
+    for target in targets:
+        runs = []
+        for mode in ["time"] * repeats + ["memory"]:
+            code = _WORKER.format(
+                src=SRC, target=target, mode=mode, startup=STARTUP
+            )
+            runs.append(run(code, data_dir, timeout))
+            if "status" in runs[-1]:
+                break
+        if "status" in runs[-1]:
+            result = runs[-1]
+        else:
+            keys = set().union(*runs)
+            result = {
+                key: statistics.median(r[key] for r in runs if key in r)
+                for key in sorted(keys)
+            }
+        results[target] = result
+        print(
+            f"  {target:<22} cold {describe(result, 'cold_s')}"
+            f"  warm {describe(result, 'warm_s')}"
+            f"  peak {describe(result, 'peak_bytes', 1 << 20, 'MB')}"
+        )
+    return results
+
+
+def describe(result, key, unit=1, suffix="s"):
+    """Return one measurement of ``result`` for printing."""
+    if "status" in result:
+        return f"{result['status']:>9}"
+    if key not in result:
+        return f"{'-':>9}"
+    return f"{result[key] / unit:8.2f}{suffix}"
+
+
+def compare(results, baseline, tolerance):
+    """Return the measurements that regressed against ``baseline``.
+
+    Returns:
+        list: A ``(scale, target, measurement, baseline, result)`` tuple
+        per regression, where a run that no longer completes counts as one.
+    """
+    regressions = []
+    for scale, old in baseline["scales"].items():
+        new = results["scales"].get(scale)
+        if new is None:
+            continue
+        for target, before in old["pages"].items():
+            after = new["pages"].get(target, {})
+            if "status" in before:
+                continue
+            if "status" in after:
+                regressions.append(
+                    (scale, target, "status", "ok", after["status"])
+                )
+                continue
+            for key, floor in FLOORS.items():
+                if key not in before or key not in after:
+                    continue
+                limit = max(before[key] * (1 + tolerance), before[key] + floor)
+                if after[key] > limit:
+                    regressions.append(
+                        (scale, target, key, before[key], after[key])
+                    )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workdir",
+        default=os.path.join(tempfile.gettempdir(), "page-benchmarks"),
+        help="directory the synthetic data of each scale is kept in",
+    )
+    parser.add_argument(
+        "--pages",
+        nargs="+",
+        help="page titles to run; every page of index.PAGES by default",
+    )
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="JSON file to write results to")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.pages is None:
+        sys.path.insert(0, SRC)
+        import index
+
+        args.pages = list(index.PAGES)
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "scales": {},
+    }
+    for scale in args.scales:
+        print(f"scale {scale:g}")
+        data_dir = os.path.join(args.workdir, f"x{scale:g}-s{args.seed}")
+        steps = setup(data_dir, scale, args.seed, args.timeout)
+        pages = {}
+        if steps["generate"].get("status", "reused") == "reused":
+            pages = measure(
+                data_dir, [STARTUP] + args.pages, args.timeout, args.repeats
+            )
+        results["scales"][f"{scale:g}"] = {"setup": steps, "pages": pages}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for scale, target, key, before, after in regressions:
+            print(f"regression x{scale} {target} {key}: {before} -> {after}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
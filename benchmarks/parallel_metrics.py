@@ -0,0 +1,78 @@
+"""Benchmark parallel betweenness and shortest paths against networkx.
+
+Times ``parallel.betweenness_centrality`` and
+``parallel.average_shortest_path_length`` on the movie and actor networks
+for 1 to N worker processes, and checks each result against the serial
+networkx output. Run from the repository root::
+
+    python benchmarks/parallel_metrics.py --processes 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import networkx as nx
+import numpy as np
+import parallel
+from datastore import ACTOR_NETWORK, FILM_NETWORK, load_graph, load_network
+
+
+def timed(func, *args, **kwargs):
+    """Return the result of ``func`` and the seconds it took."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark(name, processes):
+    """Print timings and the deviation from networkx for graph ``name``."""
+    graph = load_graph(name)
+    network = load_network(name)
+    gcc = graph.giant_component()
+    gcc_network = network.subgraph(gcc.nodes.tolist())
+
+    expected, serial = timed(
+        nx.betweenness_centrality, network, endpoints=True
+    )
+    expected = np.array([expected[n] for n in network])
+    expected_path, serial_path = timed(
+        nx.average_shortest_path_length, gcc_network
+    )
+    print(f"\n{name}: {len(graph)} nodes, {graph.number_of_edges()} edges")
+    print(f"networkx  betweenness {serial:7.2f}s  paths {serial_path:7.2f}s")
+
+    for count in processes:
+        result, elapsed = timed(
+            parallel.betweenness_centrality,
+            graph,
+            endpoints=True,
+            processes=count,
+        )
+        path, elapsed_path = timed(
+            parallel.average_shortest_path_length, gcc, processes=count
+        )
+        error = np.max(np.abs(result - expected))
+        print(
+            f"{count:2d} cores  betweenness {elapsed:7.2f}s"
+            f" (x{serial / elapsed:4.1f}, max abs. error {error:.1e})"
+            f"  paths {elapsed_path:7.2f}s"
+            f" (x{serial_path / elapsed_path:4.1f},"
+            f" {'exact' if path == expected_path else 'MISMATCH'})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count()}),
+    )
+    args = parser.parse_args()
+
+    for name in [FILM_NETWORK, ACTOR_NETWORK]:
+        benchmark(name, args.processes)
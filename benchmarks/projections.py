@@ -0,0 +1,94 @@
+"""Benchmark building the film and actor networks from cast lists.
+
+Compares linking every pair of films that share an actor, and every pair of
+co-stars, with Python loops into a ``networkx.Graph`` against
+``projections.build_networks``. The films are synthetic, with actors drawn
+from a long-tailed popularity distribution. Run from the repository root::
+
+    python benchmarks/projections.py --films 10000 100000 300000
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import pandas as pd
+from projections import build_networks
+
+
+def synthetic(films, cast=8, seed=0):
+    """Return a film table of ``films`` titles with random casts."""
+    rng = np.random.default_rng(seed)
+    actors = max(films * 3, cast)
+    sizes = rng.integers(1, 2 * cast, size=films)
+    # Zipf-like popularity: a few actors appear in many films.
+    weights = 1 / np.arange(1, actors + 1) ** 0.5
+    drawn = rng.choice(actors, size=sizes.sum(), p=weights / weights.sum())
+    casts = np.split(
+        np.char.add("a", drawn.astype(str)), np.cumsum(sizes)[:-1]
+    )
+    return pd.DataFrame(
+        {
+            "title": [f"f{i}" for i in range(films)],
+            "actors": [list(cast) for cast in casts],
+        }
+    )
+
+
+def pairwise(table):
+    """Build both networks the way a loop over shared actors would."""
+    import networkx as nx
+
+    by_actor = {}
+    film_network = nx.Graph()
+    actor_network = nx.Graph()
+    for title, cast in zip(table["title"], table["actors"]):
+        film_network.add_node(title)
+        actor_network.add_nodes_from(cast)
+        actor_network.add_edges_from(itertools.combinations(set(cast), 2))
+        for actor in cast:
+            by_actor.setdefault(actor, set()).add(title)
+    for titles in by_actor.values():
+        film_network.add_edges_from(itertools.combinations(titles, 2))
+    return film_network, actor_network
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--films", type=int, nargs="+", default=[10000])
+    parser.add_argument(
+        "--loop-limit",
+        type=int,
+        default=20000,
+        help="largest size the Python loop is timed at",
+    )
+    args = parser.parse_args()
+
+    for films in args.films:
+        table = synthetic(films)
+        start = time.perf_counter()
+        graphs = build_networks(table)
+        sparse = time.perf_counter() - start
+        sizes = ", ".join(
+            f"{name} {len(g)} nodes {g.number_of_edges()} edges"
+            for name, g in graphs.items()
+        )
+        print(f"\n{films} films: {sizes}")
+        print(f"sparse products {sparse:10.2f} s")
+        if films <= args.loop_limit:
+            start = time.perf_counter()
+            film_network, actor_network = pairwise(table)
+            loop = time.perf_counter() - start
+            assert (
+                film_network.number_of_edges()
+                == graphs["movie_network"].number_of_edges()
+            )
+            assert (
+                actor_network.number_of_edges()
+                == graphs["actor_network"].number_of_edges()
+            )
+            print(f"python loop     {loop:10.2f} s")
@@ -0,0 +1,65 @@
+"""Benchmark per-genre sentiment histograms on an enlarged plots table.
+
+Compares the previous approach, one ``iterrows`` scan per genre and score
+type with substring genre matching, against
+``sentiment.genre_score_histograms``. The bundled ``movie_plots`` table is
+resampled to the requested sizes. Run from the repository root::
+
+    python benchmarks/sentiment_by_genre.py --rows 713 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+import sentiment
+
+
+def iterrows_histograms(plots, genres, bins=30):
+    """Return the histograms the way the page used to compute them."""
+    result = {}
+    for type, column in sentiment.SCORE_COLUMNS.items():
+        result[type] = []
+        for genre in genres:
+            values = []
+            for index, row in plots.iterrows():
+                if str(genre) in str(row.genres):
+                    values.append(row[column])
+            result[type].append(np.histogram(values, bins=bins))
+    return result
+
+
+def enlarge(plots, rows, seed=0):
+    """Return ``rows`` rows resampled from ``plots`` with jittered scores."""
+    rng = np.random.default_rng(seed)
+    enlarged = plots.sample(rows, replace=True, random_state=seed)
+    for column in sentiment.SCORE_COLUMNS.values():
+        jitter = rng.normal(0, 0.01, rows)
+        enlarged[column] = np.clip(enlarged[column] + jitter, 0, 1)
+    return enlarged.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[713, 10000])
+    args = parser.parse_args()
+
+    genres = sentiment.genre_list()[:-1]
+    for rows in args.rows:
+        plots = enlarge(sentiment.movie_plots(), rows)
+
+        start = time.perf_counter()
+        iterrows_histograms(plots, genres)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sentiment.genre_score_histograms(plots, genres)
+        after = time.perf_counter() - start
+
+        print(
+            f"{rows:>9} rows  iterrows {before:8.3f}s"
+            f"  vectorised {after:8.4f}s  x{before / after:,.0f}"
+        )
@@ -0,0 +1,198 @@
+"""Prebuilt page figures and tables, versioned by a hash of the data.
+
+Chart and table functions register with ``materialize``, listing the
+arguments the pages call them with. ``python src/build.py`` runs every
+registered call once and writes the results, Plotly figures as JSON and
+DataFrames as Parquet, to ``data/store/artifacts/v<format>/<data hash>``. A
+registered function then returns its stored result whenever one exists for
+the current data, and only computes it when it does not, logging a
+warning, so fresh workers serve the pages without any graph or pandas work.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import tempfile
+import pandas as pd
+from cache import source_hash
+from datastore import STORE_DIR, atomic_write, data_version, once
+
+# Bump to invalidate every build when the stored format changes.
+ARTIFACT_VERSION = 1
+ARTIFACTS_DIR = os.path.join(STORE_DIR, "artifacts")
+MANIFEST = "manifest.json"
+
+# Registered functions, keyed by name, with the calls to build.
+_registry = {}
+# Keys of the calls this process has computed for want of an artifact.
+_misses = set()
+
+logger = logging.getLogger(__name__)
+
+
+def artifact_dir(version=None):
+    """Return the directory of the artifacts built for ``version``.
+
+    Args:
+        version (str): A ``data_version``; the current data's by default.
+    """
+    return os.path.join(
+        ARTIFACTS_DIR, f"v{ARTIFACT_VERSION}", version or data_version()
+    )
+
+
+def manifest(version):
+    """Return the artifact file of every stored call of ``version``.
+
+    Returns an empty manifest until ``version`` has been built.
+    """
+    path = os.path.join(artifact_dir(version), MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    return _read_manifest(path)
+
+
+@once
+def _read_manifest(path):
+    with open(path) as f:
+        return json.load(f)["artifacts"]
+
+
+def artifact_key(name, func, args=(), kwargs=None):
+    """Return the key a call is stored under.
+
+    Hashes ``func``'s ``source_hash``, so editing its module or a module it
+    imports retires its artifacts, and its arguments bound with defaults
+    applied, so ``f()`` and ``f(type="film")`` share a key when ``type``
+    defaults to ``"film"``.
+    """
+    bound = inspect.signature(func).bind(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    digest = hashlib.sha256(source_hash(func).encode())
+    digest.update(
+        json.dumps(bound.arguments, sort_keys=True, default=str).encode()
+    )
+    return f"{name}-{digest.hexdigest()[:12]}"
+
+
+def write_artifact(directory, key, value):
+    """Serialise ``value`` into ``directory`` and return its file name."""
+    import plotly.graph_objects as go
+
+    if isinstance(value, go.Figure):
+        filename = f"{key}.plotly.json"
+        with open(os.path.join(directory, filename), "w") as f:
+            f.write(value.to_json())
+    elif isinstance(value, pd.DataFrame):
+        filename = f"{key}.parquet"
+        value.to_parquet(os.path.join(directory, filename))
+    else:
+        filename = f"{key}.json"
+        with open(os.path.join(directory, filename), "w") as f:
+            json.dump(value, f)
+    return filename
+
+
+def read_artifact(path):
+    """Return the value stored at ``path`` by ``write_artifact``."""
+    if path.endswith(".plotly.json"):
+        import plotly.io
+
+        with open(path) as f:
+            return plotly.io.from_json(f.read())
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _log_miss(name, key, version, args, kwargs):
+    """Warn, once per call, that ``name`` is computed in the request."""
+    if key in _misses:
+        return
+    _misses.add(key)
+    func, calls = _registry[name]
+    if key not in {artifact_key(name, func, kwargs=call) for call in calls}:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        logger.warning(
+            "%s(%s) is not a registered call, so it is computed in the"
+            " request; add its arguments to materialize",
+            name,
+            ", ".join(f"{k}={v!r}" for k, v in bound.arguments.items()),
+        )
+    else:
+        logger.warning(
+            "%s has no artifact for data %s, so it is computed in the"
+            " request; run python src/build.py",
+            name,
+            version,
+        )
+
+
+def materialize(*calls):
+    """Serve the decorated function from the built artifacts.
+
+    Args:
+        *calls (dict): Keyword arguments of every call the pages make,
+            each built once by ``build_artifacts``. One call with the
+            defaults when omitted.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        _registry[name] = (func, calls or ({},))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            version = data_version()
+            key = artifact_key(name, func, args, kwargs)
+            filename = manifest(version).get(key)
+            if filename is None:
+                _log_miss(name, key, version, args, kwargs)
+                return func(*args, **kwargs)
+            return read_artifact(os.path.join(artifact_dir(version), filename))
+
+        wrapper.compute = func
+        return wrapper
+
+    return decorator
+
+
+def build_artifacts():
+    """Run every registered call and store the results.
+
+    The artifacts are written to a temporary directory that replaces the
+    directory of the current ``data_version`` once complete, so the app
+    never serves a partial build.
+
+    Returns:
+        str: The directory the artifacts were written to.
+    """
+    version = data_version()
+    target = artifact_dir(version)
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=ARTIFACTS_DIR, prefix=".tmp-")
+    try:
+        artifacts = {}
+        for name, (func, calls) in sorted(_registry.items()):
+            for kwargs in calls:
+                key = artifact_key(name, func, kwargs=kwargs)
+                artifacts[key] = write_artifact(tmp, key, func(**kwargs))
+        with atomic_write(os.path.join(tmp, MANIFEST)) as f:
+            json.dump(
+                {"data_version": version, "artifacts": artifacts},
+                f,
+                indent=1,
+            )
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _read_manifest.cache_clear()
+    return target
@@ -0,0 +1,70 @@
+"""Build what the pages read: stored results, then figures and tables.
+
+Run from the repository root whenever the data changes, for example in CI::
+
+    python src/build.py
+
+The node metrics, Louvain partition and null-model ensemble the pages read
+are built first when missing, since pages never compute them. Every page's
+figures and tables are then written to the artifact store. The app serves
+the artifacts matching the current data and computes anything that has not
+been built.
+"""
+import argparse
+import functools
+import importlib
+import os
+import time
+import artifacts
+import centrality
+import ensembles
+import partitions
+from datastore import ACTOR_NETWORK, FILM_NETWORK
+
+# Modules whose chart and table functions register artifacts.
+PAGE_MODULES = ["data", "network", "communities", "sentiment", "wordclouds"]
+
+
+def build_metrics(name):
+    """Store the exact metrics of graph ``name``, if missing."""
+    if not centrality.has_metrics(name):
+        centrality.build_metrics(name)
+
+
+def build_partition():
+    """Store the Louvain partition of the loaded graph, if missing."""
+    if not os.path.exists(partitions.stored_partition_path()):
+        partitions.build_partition()
+
+
+def build_ensemble(model="erdos_renyi", processes=None):
+    """Store the ensemble ``network.er_comparison`` reads, if missing."""
+    if not os.path.exists(ensembles.stored_ensemble_path(model)):
+        params = ensembles.film_parameters()[model]
+        ensembles.run_ensemble(model, params, processes=processes)
+
+
+# Stored results pages read but never compute, each built when missing.
+STEPS = {
+    "film_metrics": functools.partial(build_metrics, FILM_NETWORK),
+    "actor_metrics": functools.partial(build_metrics, ACTOR_NETWORK),
+    "partition": build_partition,
+    "ensemble": build_ensemble,
+}
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+
+    for step, build in STEPS.items():
+        start = time.perf_counter()
+        build()
+        print(f"{step} ({time.perf_counter() - start:.1f}s)")
+    for module in PAGE_MODULES:
+        importlib.import_module(module)
+    start = time.perf_counter()
+    directory = artifacts.build_artifacts()
+    print(
+        f"{len(os.listdir(directory)) - 1} artifacts in {directory}"
+        f" ({time.perf_counter() - start:.1f}s)"
+    )
@@ -0,0 +1,315 @@
+"""Result cache shared by every process serving the app.
+
+``cached`` replaces ``@st.cache``. Results are pickled into a pluggable
+backend under content-addressed keys that hash the function's name, the
+source of the modules it runs, its bound arguments and the version of the
+data, so any replica pointed at the same backend serves what another has
+computed, and every call returns a fresh copy rather than a shared mutable
+object.
+
+The backend is chosen by the ``APP_CACHE`` environment variable:
+
+``disk:data/store/cache?max_bytes=536870912``
+    Files under a local directory, evicting the least recently used once
+    the total size exceeds ``max_bytes``. The default.
+``redis://host:6379/0``
+    Any Redis-compatible server, through the ``redis`` package.
+``memory:``
+    ``LocalRedis``, an in-process stand-in with the same client interface.
+
+Hits, misses and backend errors are counted per function by ``stats``.
+"""
+import ast
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import urllib.parse
+import instrumentation
+from datastore import STORE_DIR, atomic_write, data_version
+
+# Directory of the app's modules, whose sources ``source_hash`` covers.
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_URL = f"disk:{os.path.join(STORE_DIR, 'cache')}"
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+
+class DiskBackend:
+    """Cache entries as files, evicting the least recently used.
+
+    Args:
+        directory (str): Directory holding one file per entry.
+        max_bytes (int): Total size the entries are trimmed to.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """Return the entry stored under ``key``, or None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                value = f.read()
+            # The modification time orders entries for eviction.
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            return None
+        return value
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` and evict entries over the limit."""
+        with atomic_write(self._path(key), "wb") as f:
+            f.write(value)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries beyond ``max_bytes``."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith(".tmp-"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class LocalRedis:
+    """An in-process stand-in for a Redis client.
+
+    Implements the ``get``, ``set`` and ``delete`` calls ``RedisBackend``
+    makes, evicting the least recently used keys beyond ``max_bytes`` as a
+    server with an ``allkeys-lru`` policy would.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._data = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._data:
+                return None
+            self._data.move_to_end(name)
+            return self._data[name]
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            if name in self._data:
+                self._size -= len(self._data.pop(name))
+            self._data[name] = value
+            self._size += len(value)
+            while self._size > self.max_bytes and len(self._data) > 1:
+                self._size -= len(self._data.popitem(last=False)[1])
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            removed = 0
+            for name in names:
+                if name in self._data:
+                    self._size -= len(self._data.pop(name))
+                    removed += 1
+            return removed
+
+
+class RedisBackend:
+    """Cache entries in a Redis-compatible server.
+
+    Args:
+        client: A ``redis.Redis`` client or ``LocalRedis``.
+        prefix (str): Prepended to every key.
+        ttl (int): Seconds each entry lives; until evicted by default.
+    """
+
+    def __init__(self, client, prefix="cache:", ttl=None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        """Return the entry stored under ``key``, or None."""
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``."""
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+
+def backend_from_url(url):
+    """Return the backend described by ``url``.
+
+    Args:
+        url (str): ``disk:<directory>``, ``redis://...`` or ``memory:``,
+            with an optional ``max_bytes`` (disk, memory) or ``ttl``
+            (redis) query parameter.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    max_bytes = int(query.get("max_bytes", DEFAULT_MAX_BYTES))
+    if parts.scheme == "disk":
+        return DiskBackend(parts.netloc + parts.path, max_bytes)
+    if parts.scheme == "memory":
+        return RedisBackend(LocalRedis(max_bytes))
+    if parts.scheme in ("redis", "rediss"):
+        import redis
+
+        ttl = int(query["ttl"]) if "ttl" in query else None
+        return RedisBackend(redis.Redis.from_url(url), ttl=ttl)
+    raise ValueError(
+        "Expecting a 'disk:', 'memory:' or 'redis://' cache URL,"
+        f" but received {url!r}"
+    )
+
+
+# Not ``once``: clearing it when the data changes would drop a memory backend.
+@functools.lru_cache(maxsize=None)
+def backend():
+    """Return the backend configured by ``APP_CACHE``."""
+    return backend_from_url(os.environ.get("APP_CACHE", DEFAULT_URL))
+
+
+# Hit, miss and error counts of this process, by function.
+_stats = collections.defaultdict(collections.Counter)
+_stats_lock = threading.Lock()
+
+
+def _count(name, event):
+    with _stats_lock:
+        _stats[name][event] += 1
+
+
+def stats():
+    """Return this process's cache counts by function.
+
+    Returns:
+        dict: Maps each cached function to its ``hits``, ``misses`` and
+        backend ``errors``.
+    """
+    with _stats_lock:
+        return {
+            name: {
+                event: counts[event] for event in ("hits", "misses", "errors")
+            }
+            for name, counts in _stats.items()
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def local_imports(path):
+    """Return the source files of the app's modules that ``path`` imports.
+
+    Includes ``path`` and the modules imported by those, however deeply,
+    whether imported at the top of a module or inside a function.
+    """
+    files = set()
+    pending = [path]
+    while pending:
+        path = pending.pop()
+        if path in files or not os.path.exists(path):
+            continue
+        files.add(path)
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                names = [node.module]
+            else:
+                continue
+            pending.extend(
+                os.path.join(SRC_DIR, f"{name.split('.')[0]}.py")
+                for name in names
+            )
+    return tuple(sorted(files))
+
+
+@functools.lru_cache(maxsize=None)
+def source_hash(func):
+    """Return a hash of the code ``func`` runs.
+
+    Hashes the source of the module defining ``func``, or what it wraps,
+    and of every module of the app it imports, so a change to a helper or
+    constant in another module also gives new keys.
+    """
+    path = inspect.getsourcefile(inspect.unwrap(func))
+    digest = hashlib.sha256()
+    for path in local_imports(os.path.abspath(path)):
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def cache_key(func, args=(), kwargs=None):
+    """Return the content-addressed key of calling ``func``.
+
+    Hashes the function's qualified name and ``source_hash``, its arguments
+    bound with defaults applied, and ``data_version``, so a change to any of
+    them gives a new key and stale entries simply age out of the backend.
+    """
+    bound = inspect.signature(func).bind(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    digest = hashlib.sha256()
+    for part in [
+        f"{func.__module__}.{func.__qualname__}",
+        source_hash(func),
+        json.dumps(bound.arguments, sort_keys=True, default=repr),
+        data_version(),
+    ]:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cached(func):
+    """Cache the results of ``func`` in the shared backend.
+
+    Backend failures are counted and fall through to computing the result,
+    so an unreachable cache slows the app down rather than breaking it.
+    Calls are timed by ``instrumentation`` when it is on, with the pickled
+    size of the result.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with instrumentation.timed(name) as call:
+            key = cache_key(func, args, kwargs)
+            try:
+                value = backend().get(key)
+            except Exception:
+                _count(name, "errors")
+                value = None
+            if value is not None:
+                _count(name, "hits")
+                call["size"] = len(value)
+                return pickle.loads(value)
+
+            _count(name, "misses")
+            result = func(*args, **kwargs)
+            value = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            call["size"] = len(value)
+            try:
+                backend().set(key, value)
+            except Exception:
+                _count(name, "errors")
+            return result
+
+    return wrapper
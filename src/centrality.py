@@ -0,0 +1,307 @@
+"""Node centrality metrics, computed once per graph version and stored.
+
+Degree, betweenness, eigenvector, closeness and PageRank centrality, and
+the average neighbour degree, are written as one column per metric to
+``data/store/metrics``, keyed by the graph's content hash and the
+betweenness mode. Pages only read the table and fail if it is missing.
+Precompute it with ``python src/build.py``, or for one graph with::
+
+    python src/centrality.py --graph movie_network
+
+When nodes are added to a graph, ``update_metrics`` carries exact
+betweenness and closeness over from the previous table for every connected
+component the update did not touch, so only the changed components are
+measured again.
+
+Betweenness is exact by default. For large graphs pass ``--epsilon`` to
+estimate it from a sample of pivot sources instead; with probability
+``1 - delta`` every node's estimate is then within ``epsilon`` of the exact
+normalised value.
+"""
+import argparse
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+from datastore import (
+    FILM_NETWORK,
+    GRAPHS,
+    STORE_DIR,
+    atomic_write,
+    load_graph,
+    once,
+)
+import parallel
+
+
+METRICS = [
+    "degree",
+    "betweenness",
+    "eigenvector",
+    "closeness",
+    "pagerank",
+    "average_neighbor_degree",
+]
+# Metrics that, up to normalisation by the number of nodes, only depend on
+# the node's connected component.
+COMPONENT_METRICS = ["betweenness", "closeness"]
+DELTA = 0.1
+SEED = 0
+
+
+def betweenness_pivots(n, epsilon, delta=DELTA):
+    """Return how many pivots bound the betweenness error by ``epsilon``.
+
+    Each pivot's contribution to a node's normalised betweenness, scaled by
+    ``n``, lies in [0, 1], so Hoeffding's inequality with a union bound over
+    the ``n`` nodes gives the sample size.
+
+    Args:
+        n (int): Number of nodes.
+        epsilon (float): Largest tolerated absolute error.
+        delta (float): Probability that some node exceeds ``epsilon``.
+    """
+    return math.ceil(math.log(2 * n / delta) / (2 * epsilon**2))
+
+
+def compute_metrics(csr, epsilon=None, delta=DELTA, seed=SEED, processes=None):
+    """Return a DataFrame of centrality metrics indexed by node.
+
+    Args:
+        csr (CSRGraph): The graph to measure.
+        epsilon (float): Error bound for sampled betweenness, or None for
+            exact betweenness.
+        delta (float): Failure probability of the betweenness bound.
+        seed (int): Seed for the pivot sample.
+        processes (int): Worker processes for exact betweenness.
+    """
+    import networkx as nx
+
+    graph = csr.to_networkx()
+    n = len(graph)
+    k = None
+    if epsilon is not None and betweenness_pivots(n, epsilon, delta) < n:
+        k = betweenness_pivots(n, epsilon, delta)
+
+    if k is None:
+        betweenness = dict(
+            zip(
+                graph,
+                parallel.betweenness_centrality(
+                    csr, endpoints=True, processes=processes
+                ),
+            )
+        )
+    else:
+        betweenness = nx.betweenness_centrality(
+            graph, k=k, endpoints=True, seed=seed
+        )
+
+    columns = _graph_metrics(graph)
+    columns["betweenness"] = betweenness
+    columns["closeness"] = nx.closeness_centrality(graph)
+    metrics = pd.DataFrame(
+        {name: [columns[name][v] for v in graph] for name in METRICS},
+        index=pd.Index(list(graph), name="node"),
+    )
+    metrics.attrs["pivots"] = k
+    return metrics
+
+
+def _graph_metrics(graph):
+    """Return the metrics that are cheap to compute on the whole graph."""
+    import networkx as nx
+
+    return {
+        "degree": nx.degree_centrality(graph),
+        "eigenvector": nx.eigenvector_centrality(graph),
+        "pagerank": nx.pagerank(graph),
+        "average_neighbor_degree": nx.average_neighbor_degree(graph),
+    }
+
+
+def metrics_path(name, epsilon=None, graph=None):
+    """Return the file the metrics of graph ``name`` are stored in.
+
+    Args:
+        name (str): One of ``datastore.GRAPHS``.
+        epsilon (float): Betweenness error bound, or None for exact.
+        graph (CSRGraph): The version of the graph; the loaded one by
+            default.
+    """
+    mode = "exact" if epsilon is None else f"e{epsilon:g}"
+    graph_hash = (graph or load_graph(name)).content_hash()
+    return os.path.join(
+        STORE_DIR, "metrics", f"{name}-{graph_hash[:16]}-{mode}.npz"
+    )
+
+
+def build_metrics(
+    name=FILM_NETWORK, epsilon=None, delta=DELTA, seed=SEED, processes=None
+):
+    """Compute the metrics of graph ``name`` and store them."""
+    metrics = compute_metrics(
+        load_graph(name), epsilon, delta, seed, processes
+    )
+    meta = {"epsilon": epsilon, "delta": delta, "seed": seed}
+    meta["pivots"] = metrics.attrs["pivots"]
+    _save_metrics(metrics_path(name, epsilon), metrics, meta)
+    return metrics
+
+
+def _save_metrics(path, metrics, meta):
+    """Write a metrics table and its parameters to ``path``."""
+    with atomic_write(path, "wb") as f:
+        np.savez(
+            f,
+            nodes=np.asarray(metrics.index, dtype=str),
+            meta=np.asarray(json.dumps(meta)),
+            **{column: metrics[column].to_numpy() for column in METRICS},
+        )
+
+
+def update_metrics(name, previous, graph, changed, processes=None):
+    """Store the exact metrics of ``graph`` from those of ``previous``.
+
+    ``graph`` must be ``previous`` with nodes and edges added, as returned
+    by ``CSRGraph.extend``. Betweenness and closeness of every component
+    without a ``changed`` node are carried over and rescaled to the new
+    number of nodes, and only the changed components are measured again.
+    The other metrics are cheap and computed on the whole graph.
+
+    Args:
+        name (str): One of ``datastore.GRAPHS``.
+        previous (CSRGraph): The graph before the update.
+        graph (CSRGraph): The updated graph.
+        changed (np.ndarray): Positions of the nodes whose edges changed,
+            the added nodes included.
+        processes (int): Worker processes for betweenness.
+
+    Returns:
+        pd.DataFrame: The stored metrics, or None when ``previous`` had no
+        stored exact metrics to start from.
+    """
+    import networkx as nx
+
+    path = metrics_path(name, graph=previous)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as table:
+        if not set(METRICS) <= set(table.files):
+            return None
+        stored = {column: table[column] for column in COMPONENT_METRICS}
+
+    n_old, n = len(previous), len(graph)
+    labels = graph.component_labels()
+    affected = np.isin(labels, labels[changed])
+    kept = np.flatnonzero(~affected[:n_old])
+    positions = np.flatnonzero(affected)
+    component = graph.subgraph(positions)
+
+    # Stored betweenness is scaled by 1 / (n (n - 1)) and closeness of a
+    # graph with several components by 1 / (n - 1).
+    betweenness = np.zeros(n)
+    closeness = np.zeros(n)
+    if n_old > 1:
+        scale = n_old * (n_old - 1) / (n * (n - 1))
+        betweenness[kept] = stored["betweenness"][kept] * scale
+        closeness[kept] = stored["closeness"][kept] * (n_old - 1) / (n - 1)
+    betweenness[positions] = parallel.betweenness_centrality(
+        component, normalized=False, endpoints=True, processes=processes
+    ) * (2 / (n * (n - 1)))
+    if len(component) > 1:
+        local = nx.closeness_centrality(component.to_networkx())
+        closeness[positions] = np.fromiter(
+            local.values(), dtype=float, count=len(local)
+        ) * ((len(component) - 1) / (n - 1))
+
+    network = graph.to_networkx()
+    columns = _graph_metrics(network)
+    metrics = pd.DataFrame(
+        {column: [columns[column][v] for v in network] for column in columns},
+        index=pd.Index(list(network), name="node"),
+    )
+    metrics["betweenness"] = betweenness
+    metrics["closeness"] = closeness
+    metrics = metrics[METRICS]
+    meta = {"epsilon": None, "delta": DELTA, "seed": SEED, "pivots": None}
+    meta["updated_from"] = previous.content_hash()
+    _save_metrics(metrics_path(name, graph=graph), metrics, meta)
+    return metrics
+
+
+def top_by_group(values, groups, k=5):
+    """Return the ``k`` largest values within every group in one pass.
+
+    Ties keep node order, as sorting each group separately would.
+
+    Args:
+        values (pd.Series): One value per node, indexed by node.
+        groups (pd.Series): The group, or list of groups, of each node, on
+            the same index.
+        k (int): Values kept per group.
+
+    Returns:
+        pd.Series: The top values indexed by group and node, groups in
+        sorted order and values in descending order within each group.
+    """
+    table = pd.DataFrame({"group": groups, "value": values})
+    table = table.explode("group").dropna(subset=["group"])
+    table = table.sort_values(["group", "value"], ascending=[True, False])
+    top = table.groupby("group", sort=False).head(k)
+    return top.set_index("group", append=True)["value"].swaplevel()
+
+
+def has_metrics(name=FILM_NETWORK, epsilon=None):
+    """Return whether graph ``name`` has a stored table of every metric.
+
+    Tables stored before one of ``METRICS`` was added do not count.
+    """
+    path = metrics_path(name, epsilon)
+    if not os.path.exists(path):
+        return False
+    with np.load(path) as table:
+        return set(METRICS) <= set(table.files)
+
+
+@once
+def load_metrics(name=FILM_NETWORK, epsilon=None):
+    """Return the stored metrics of graph ``name``.
+
+    Args:
+        name (str): One of ``datastore.GRAPHS``.
+        epsilon (float): Betweenness error bound the table was built with,
+            or None for exact betweenness.
+
+    Raises:
+        FileNotFoundError: If no table of every metric is stored for the
+            loaded graph, see ``build.py``.
+    """
+    if not has_metrics(name, epsilon):
+        mode = "" if epsilon is None else f" --epsilon {epsilon:g}"
+        raise FileNotFoundError(
+            f"No metrics of {name} stored at {metrics_path(name, epsilon)};"
+            f" build them with python src/centrality.py --graph {name}{mode}"
+            " or python src/build.py"
+        )
+    with np.load(metrics_path(name, epsilon)) as table:
+        return pd.DataFrame(
+            {column: table[column] for column in METRICS},
+            index=pd.Index(table["nodes"].tolist(), name="node"),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graph", choices=GRAPHS, default=FILM_NETWORK)
+    parser.add_argument("--epsilon", type=float, default=None)
+    parser.add_argument("--delta", type=float, default=DELTA)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    metrics = build_metrics(
+        args.graph, args.epsilon, args.delta, args.seed, args.processes
+    )
+    print(metrics.describe().T)
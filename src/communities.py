@@ -3,40 +3,23 @@ import numpy as np
 import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
-from community import community_louvain
-from constants import FILM_DATA, FILM_NETWORK_COMMUNITY
-
-
-partition = community_louvain.best_partition(FILM_NETWORK_COMMUNITY)
-communities = {}
-for key, value in sorted(partition.items()):
-    communities.setdefault(value, []).append(key)
-
-community_sizes = {}
-for k in sorted(communities, key=lambda k: len(communities[k]), reverse=True):
-    community_sizes[k] = len(communities[k])
-
-largest_communities = {}
-for (key, value) in communities.items():
-    if key in list(community_sizes)[:5]:
-        largest_communities[key] = value
-
-community_names = {}
-for com in communities:
-    temp_degree_dict = {}
-    for character in communities[com]:
-        film = FILM_DATA[FILM_DATA["link"] == character]
-        title = (
-            character
-            if film.empty
-            else FILM_DATA[FILM_DATA["link"] == character].title.values[0]
-        )
-
-        temp_degree_dict[title] = FILM_NETWORK_COMMUNITY.degree[character]
+from artifacts import materialize
+from cache import cached
+from datastore import films_by_link, once
+from partitions import load_partition
+
+
+@once
+def largest_communities():
+    """Return the members of the five largest Louvain communities."""
+    tables = load_partition()
+    largest = list(tables["community_sizes"])[:5]
+    return {
+        key: value
+        for key, value in tables["communities"].items()
+        if key in largest
+    }
 
-    community_names[com] = sorted(
-        temp_degree_dict, key=temp_degree_dict.get, reverse=True
-    )[:3]
 
 def render_community_text():
     st.write(f"# Movie Community Detection")
@@ -56,7 +39,8 @@ def render_community_text():
     st.write(f"*Community 4* includes fantasy, adventure movies like **Lord of the Rings** and **Star Wars**")
     st.write(f"*Community 5* includes superheroe movie series like **Avengers, Captain America, Iron Man, Spider Man**")
 
-@st.cache
+@cached
+@materialize()
 def community_box_office_histogram():
     """Returns a figure object of box office histograms for each community."""
     fig = make_subplots(rows=5, cols=1, shared_xaxes=True, shared_yaxes=True)
@@ -67,43 +51,31 @@ def community_box_office_histogram():
     fig.update_xaxes(title_text="USD", row=5, col=1)
 
     counter = 1
-    for k, dk in largest_communities.items():
-        temp_df = FILM_DATA[FILM_DATA["link"].isin(dk)]
+    for k, dk in largest_communities().items():
+        temp_df = films_by_link().reindex(dk).dropna(subset=["box_office"])
         hist, bins = np.histogram(temp_df.box_office, bins=30)
         fig.add_trace(go.Bar(x=bins[:-1], y=hist, name=k), counter, 1)
         counter += 1
     return fig
 
 
-@st.cache(allow_output_mutation=True)
+@cached
+@materialize()
 def community_box_office_barchart():
     """Returns a bar chart of the total box office distribution for each genre"""
 
-    box_office_sums = {}
-    for index, values in communities.items():
-        box_office_sum = 0
-
-        for title in values:
-            try:
-                box_office_sum = (
-                    box_office_sum
-                    + FILM_DATA[FILM_DATA["link"] == title].box_office.values[
-                        0
-                    ]
-                )
-            except IndexError as e:
-                print("Could not load ", title, e)
-
-        box_office_sums[index] = box_office_sum / len(values)
+    tables = load_partition()
+    box_office_sums = tables["community_box_office"]
+    communities = tables["communities"]
 
     community_size_bar_chart_data = {
         "Total Box Office": list(box_office_sums.values()),
         "Community Number": list(box_office_sums.keys()),
-        "Top Movies": list(community_names.values()),
+        "Top Movies": list(tables["community_names"].values()),
     }
 
     color_discrete_sequence = ["#636efa"] * len(communities)
-    for index in largest_communities:
+    for index in largest_communities():
         bar_index = list(communities.keys()).index(index)
         color_discrete_sequence[bar_index] = "#ffa15a"
 
@@ -119,14 +91,17 @@ def community_box_office_barchart():
     return fig
 
 
-@st.cache(allow_output_mutation=True)
+@cached
+@materialize()
 def community_size_distribution_graph():
     """Returns a figure object for the community size distribution graph."""
 
+    tables = load_partition()
+    community_sizes = tables["community_sizes"]
     community_size_bar_chart_data = {
         "Community Size": list(community_sizes.values()),
         "Community Number": list(community_sizes.keys()),
-        "Top Movies": list(community_names.values()),
+        "Top Movies": list(tables["community_names"].values()),
     }
     fig = px.bar(
         community_size_bar_chart_data,
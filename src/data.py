@@ -1,36 +1,80 @@
 import streamlit as st
-import ast
-import plotly.express as px
-from constants import FILM_DATA
+import numpy as np
+from plotly.subplots import make_subplots
+from artifacts import materialize
+from cache import cached
+from datastore import COUNTED_COLUMNS, FILM_DATA, LIST_COLUMNS, film_data
+from figures import histogram_bar, markers
 
+# Bin counts the box office histogram slider offers.
+BINS = range(3, 201)
 
-@st.cache
+
+@cached
+@materialize(*({"bins": bins} for bins in BINS))
 def box_office_histogram(bins):
     """Return Figure object for box office historgram.
 
+    The bins are counted here, so the figure holds one bar per bin and at
+    most ``figures.MAX_POINTS`` rug marks however many films there are.
+
     Args:
         bins (int): The number of bins for the histogram.
     """
-    return px.histogram(
-        FILM_DATA,
-        x="box_office",
-        marginal="rug",
-        title="Box Office Distrubtion",
-        nbins=bins,
+    values = np.sort(film_data(["box_office"])["box_office"].dropna())
+    hist, edges = np.histogram(values, bins=bins)
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        shared_xaxes=True,
+        row_heights=[0.25, 0.75],
+        vertical_spacing=0.01,
+    )
+    # A rug of the films' box office, thinned to quantiles on large data.
+    fig.add_trace(
+        markers(
+            values,
+            np.zeros(len(values)),
+            marker=dict(symbol="line-ns-open", size=16),
+            hoverinfo="x",
+        ),
+        1,
+        1,
     )
+    fig.add_trace(histogram_bar(hist, edges), 2, 1)
+    fig.update_yaxes(showticklabels=False, showgrid=False, row=1, col=1)
+    fig.update_xaxes(title_text="box_office", row=2, col=1)
+    fig.update_yaxes(title_text="count", row=2, col=1)
+    fig.update_layout(title_text="Box Office Distrubtion", showlegend=False)
+    return fig
 
 
-@st.cache
+@cached
+@materialize(
+    {"attribute": "actors"},
+    {"attribute": "directors"},
+    {"attribute": "producers"},
+    {"attribute": "writers"},
+)
 def average_number_of(attribute):
     """Return average number of provdide attributes"""
     if attribute in ["actors", "directors", "producers", "writers"]:
-        xs = FILM_DATA[attribute]
-        sum = 0
-        for x in xs:
-            sum += len(ast.literal_eval(x))
-        return round(sum / len(FILM_DATA), 2)
+        column = f"n_{attribute}"
+        return round(film_data([column])[column].mean(), 2)
     else:
         raise TypeError(
             "Expecting one of 'actors', 'directors', 'producers', 'writers'\n"
             f"Got '{attribute}'"
         )
+
+
+@cached
+@materialize()
+def dataset_csv():
+    """Return the film dataset as CSV text for download."""
+    counts = [f"n_{column}" for column in COUNTED_COLUMNS[FILM_DATA]]
+    films = film_data().drop(columns=counts)
+    # Stored lists come back as arrays, which would print as "['a' 'b']".
+    for column in LIST_COLUMNS[FILM_DATA]:
+        films[column] = films[column].map(list, na_action="ignore")
+    return films.to_csv()
@@ -0,0 +1,757 @@
+"""Lazily loaded, process-wide handles on the app's data.
+
+Nothing is read at import time. Each loader reads its file the first time it
+is called and keeps the result for the life of the process, so every
+Streamlit session served by that process shares one copy.
+
+Graphs are kept in a compact store under ``data/store/graphs`` as CSR
+adjacency arrays plus a node attribute table, all plain ``.npy`` files that
+are memory-mapped on load. Build the store from the pickles with::
+
+    python src/datastore.py
+
+Tables are ingested into ``data/store/tables`` as Parquet with explicit
+dtypes, with list columns such as ``actors`` and ``genres`` stored as real
+lists next to a precomputed ``n_<column>`` length, so nothing downstream
+parses Python literals. The same command ingests them. Pass ``columns`` to
+the table loaders to read only the columns a page needs.
+
+When the store has not been built the loaders fall back to the pickles and
+CSV files, parsing list columns once per process.
+
+Films added to the store since it was built, see ``updates.py``, are logged
+in ``data/store/updates.json``, which is versioned with the raw files.
+"""
+
+import ast
+import collections
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import instrumentation
+
+# Directory of the raw data, ``data`` unless ``APP_DATA`` names another.
+DATA_DIR = os.environ.get("APP_DATA", "data")
+STORE_DIR = os.path.join(DATA_DIR, "store")
+UPDATES_LOG = os.path.join(STORE_DIR, "updates.json")
+
+FILM_NETWORK = "movie_network"
+FILM_NETWORK_COMMUNITY = "movie_network_community"
+ACTOR_NETWORK = "actor_network"
+GRAPHS = [FILM_NETWORK, FILM_NETWORK_COMMUNITY, ACTOR_NETWORK]
+
+# Joins list-valued node attributes into one fixed-width string on disk.
+LIST_SEPARATOR = "\x1f"
+
+FILM_DATA = "dataset"
+GENRE_TF_IDF = "genres_tf_idf"
+MOVIE_PLOTS = "movie_plots"
+TABLES = [FILM_DATA, GENRE_TF_IDF, MOVIE_PLOTS]
+
+# Columns each raw table stores as Python list literals.
+LIST_COLUMNS = {
+    FILM_DATA: ["actors", "directors", "producers", "writers", "genres"],
+    GENRE_TF_IDF: ["Top_10_TF", "Top_10_TF_IDF"],
+    MOVIE_PLOTS: ["genres"],
+}
+# Dtypes of the scalar columns of each table.
+DTYPES = {
+    FILM_DATA: {
+        "title": "object",
+        "link": "object",
+        "box_office": "float64",
+        "plot": "object",
+        "community": "int64",
+        "bo_group": "category",
+    },
+    GENRE_TF_IDF: {"Genre": "object"},
+    MOVIE_PLOTS: {
+        "positive": "float64",
+        "negative": "float64",
+        "neutral": "float64",
+        "compound": "float64",
+        "bo_groups": "category",
+    },
+}
+# List columns whose lengths are stored as ``n_<column>``.
+COUNTED_COLUMNS = {
+    FILM_DATA: ["actors", "directors", "producers", "writers", "genres"],
+}
+
+
+# Every function cached by ``once``, cleared together when the data changes.
+_once_functions = []
+# Hit and miss counts of this process, by ``once`` function.
+_once_stats = collections.defaultdict(collections.Counter)
+_once_stats_lock = threading.Lock()
+
+
+def once_stats():
+    """Return this process's ``once`` counts by function.
+
+    Returns:
+        dict: Maps each ``once`` function to its ``hits`` and ``misses``.
+    """
+    with _once_stats_lock:
+        return {
+            name: {event: counts[event] for event in ("hits", "misses")}
+            for name, counts in _once_stats.items()
+        }
+
+
+def once(func):
+    """Cache ``func`` until the data changes, computing each key once.
+
+    Hits and misses are counted by ``once_stats`` and calls are timed by
+    ``instrumentation`` when it is on.
+    """
+    cached = functools.lru_cache(maxsize=None)(func)
+    lock = threading.RLock()
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with instrumentation.timed(name):
+            with lock:
+                misses = cached.cache_info().misses
+                result = cached(*args, **kwargs)
+                missed = cached.cache_info().misses > misses
+        with _once_stats_lock:
+            _once_stats[name]["misses" if missed else "hits"] += 1
+        return result
+
+    wrapper.cache_clear = cached.cache_clear
+    _once_functions.append(wrapper)
+    return wrapper
+
+
+class CSRGraph:
+    """Undirected graph stored as CSR adjacency arrays and a node table.
+
+    Node ``i`` has label ``nodes[i]`` and neighbours
+    ``indices[indptr[i]:indptr[i + 1]]``.
+
+    Args:
+        nodes (np.ndarray): Node labels.
+        indptr (np.ndarray): Row offsets into ``indices``, one per node + 1.
+        indices (np.ndarray): Concatenated neighbour positions.
+        attributes (dict): Maps attribute name to an array of node values.
+            List-valued attributes are object arrays of lists.
+    """
+
+    def __init__(self, nodes, indptr, indices, attributes=None):
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.attributes = attributes or {}
+        self._index = None
+        # Directory the arrays are memory-mapped from, if any.
+        self.path = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        """Return the number of edges."""
+        loops = np.count_nonzero(self.sources() == self.indices)
+        return (len(self.indices) + loops) // 2
+
+    @functools.cached_property
+    def degrees(self):
+        """Node degrees, counting self-loops twice like networkx."""
+        degrees = np.diff(self.indptr).astype(np.int64)
+        sources = self.sources()
+        loops = sources[sources == self.indices]
+        return degrees + np.bincount(loops, minlength=len(self))
+
+    def content_hash(self):
+        """Return a SHA-256 digest of the node labels and adjacency."""
+        digest = hashlib.sha256()
+        for array in (self.nodes, self.indptr, self.indices):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def sources(self):
+        """Return the row position of every entry in ``indices``."""
+        return np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+    def index(self, node):
+        """Return the position of ``node``."""
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self.nodes.tolist())}
+        return self._index[node]
+
+    def subgraph(self, positions):
+        """Return the subgraph induced by the sorted node ``positions``."""
+        keep = np.zeros(len(self), dtype=bool)
+        keep[positions] = True
+        remap = np.cumsum(keep) - 1
+        sources = self.sources()
+        edges = keep[sources] & keep[self.indices]
+        indptr = np.zeros(np.count_nonzero(keep) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(
+            np.bincount(remap[sources[edges]], minlength=len(indptr) - 1)
+        )
+        return CSRGraph(
+            np.asarray(self.nodes)[keep],
+            indptr,
+            remap[self.indices[edges]].astype(np.int32),
+            {k: np.asarray(v)[keep] for k, v in self.attributes.items()},
+        )
+
+    def component_labels(self):
+        """Return the connected component number of every node."""
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        matrix = csr_matrix(
+            (np.ones(len(self.indices)), self.indices, self.indptr),
+            shape=(len(self), len(self)),
+        )
+        return connected_components(matrix, directed=False)[1]
+
+    def giant_component(self):
+        """Return the subgraph induced by the largest connected component."""
+        labels = self.component_labels()
+        return self.subgraph(
+            np.flatnonzero(labels == np.bincount(labels).argmax())
+        )
+
+    def attribute(self, name):
+        """Return the per-node values of attribute ``name``."""
+        return self.attributes[name]
+
+    def to_networkx(self):
+        """Return an equivalent networkx.Graph, node attributes included."""
+        import networkx as nx
+
+        labels = self.nodes.tolist()
+        columns = {k: v.tolist() for k, v in self.attributes.items()}
+        graph = nx.Graph()
+        graph.add_nodes_from(
+            (label, {k: v[i] for k, v in columns.items()})
+            for i, label in enumerate(labels)
+        )
+        sources = self.sources()
+        upper = sources <= self.indices
+        graph.add_edges_from(
+            (labels[u], labels[v])
+            for u, v in zip(sources[upper], self.indices[upper])
+        )
+        return graph
+
+    @classmethod
+    def from_edges(cls, nodes, sources, targets, attributes=None):
+        """Build a CSRGraph from arrays of edge endpoint positions.
+
+        Args:
+            nodes (np.ndarray): Node labels.
+            sources (np.ndarray): First endpoint of each edge.
+            targets (np.ndarray): Second endpoint of each edge.
+            attributes (dict): Maps attribute name to an array of values.
+        """
+        # Store both directions, except for self-loops which networkx keeps
+        # once in the adjacency.
+        reverse = sources != targets
+        rows = np.concatenate([sources, targets[reverse]])
+        columns = np.concatenate([targets, sources[reverse]])
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(nodes)))
+        return cls(
+            np.asarray(nodes),
+            indptr,
+            columns[order].astype(np.int32),
+            attributes,
+        )
+
+    def extend(self, nodes, sources, targets, attributes=None):
+        """Return the graph with ``nodes`` and edges between positions added.
+
+        Positions from ``len(self)`` on refer to the added ``nodes``. Edges
+        the graph already has are skipped, and existing rows keep their
+        neighbours in order, with new neighbours appended.
+
+        Args:
+            nodes (np.ndarray): Labels of the added nodes.
+            sources (np.ndarray): First endpoint of each added edge.
+            targets (np.ndarray): Second endpoint of each added edge.
+            attributes (dict): Maps every attribute name to the values of
+                the added nodes.
+        """
+        n_old = len(self)
+        n = n_old + len(nodes)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        low = np.minimum(sources, targets)
+        high = np.maximum(sources, targets)
+        # One key per node pair drops repeated and existing edges.
+        keys, first = np.unique(low * n + high, return_index=True)
+        old_sources = self.sources()
+        new = ~np.isin(keys, old_sources * n + self.indices)
+        low, high = low[first[new]], high[first[new]]
+
+        reverse = low != high
+        rows = np.concatenate([old_sources, low, high[reverse]])
+        columns = np.concatenate([self.indices, high, low[reverse]])
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=n))
+
+        extended = {}
+        for name, values in self.attributes.items():
+            added = list(attributes[name])
+            if values.dtype == object:
+                column = np.empty(n, dtype=object)
+                column[:n_old] = values
+                for i, value in enumerate(added, n_old):
+                    column[i] = list(value)
+            else:
+                dtype = str if values.dtype.kind == "U" else values.dtype
+                column = np.concatenate(
+                    [values, np.asarray(added, dtype=dtype)]
+                )
+            extended[name] = column
+        return CSRGraph(
+            np.concatenate([self.nodes, np.asarray(nodes, dtype=str)]),
+            indptr,
+            columns[order].astype(np.int32),
+            extended,
+        )
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """Build a CSRGraph from a networkx.Graph."""
+        labels = list(graph)
+        index = {n: i for i, n in enumerate(labels)}
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(graph._adj[n]) for n in labels])
+        indices = np.fromiter(
+            (index[v] for n in labels for v in graph._adj[n]),
+            dtype=np.int32,
+            count=indptr[-1],
+        )
+        names = []
+        for data in graph._node.values():
+            names.extend(k for k in data if k not in names)
+        attributes = {}
+        for name in names:
+            values = [graph._node[n].get(name) for n in labels]
+            if any(isinstance(v, (list, tuple)) for v in values):
+                column = np.empty(len(values), dtype=object)
+                column[:] = [list(v or []) for v in values]
+            else:
+                column = np.asarray(values)
+            attributes[name] = column
+        return cls(np.asarray(labels, dtype=str), indptr, indices, attributes)
+
+    def save(self, path):
+        """Write the graph to directory ``path``."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "nodes.npy"), self.nodes)
+        np.save(os.path.join(path, "indptr.npy"), self.indptr)
+        np.save(os.path.join(path, "indices.npy"), self.indices)
+        list_attributes = []
+        for name, values in self.attributes.items():
+            if values.dtype == object:
+                if all(isinstance(v, (list, tuple)) for v in values):
+                    list_attributes.append(name)
+                    values = np.asarray(
+                        [LIST_SEPARATOR.join(map(str, v)) for v in values],
+                        dtype=str,
+                    )
+                else:
+                    # Scalar strings such as titles, kept whole.
+                    values = values.astype(str)
+            np.save(os.path.join(path, f"attr.{name}.npy"), values)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "attributes": list(self.attributes),
+                    "list_attributes": list_attributes,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Read a graph written by ``save``, memory-mapping its arrays."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        def array(name):
+            return np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+
+        attributes = {}
+        for name in meta["attributes"]:
+            values = array(f"attr.{name}.npy")
+            if name in meta["list_attributes"]:
+                column = np.empty(len(values), dtype=object)
+                column[:] = [
+                    v.split(LIST_SEPARATOR) if v else [] for v in values
+                ]
+                values = column
+            attributes[name] = values
+        graph = cls(
+            array("nodes.npy"),
+            array("indptr.npy"),
+            array("indices.npy"),
+            attributes,
+        )
+        graph.path = path
+        return graph
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w"):
+    """Open ``path`` through a temporary file that replaces it on success.
+
+    Readers in other processes see either the old file or the complete new
+    one, never a partial write.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def graph_path(name):
+    """Return the store directory of graph ``name``."""
+    return os.path.join(STORE_DIR, "graphs", name)
+
+
+def save_graph(name, graph):
+    """Write ``graph`` to the store as graph ``name``.
+
+    The arrays are written to a new directory that replaces the old one, so
+    processes that memory-mapped the previous version keep reading it until
+    they reload.
+    """
+    with replacing_directory(graph_path(name)) as tmp:
+        graph.save(tmp)
+
+
+@contextlib.contextmanager
+def replacing_directory(target):
+    """Yield a new directory that replaces ``target`` once complete."""
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        yield tmp
+        if os.path.isdir(target):
+            old = f"{tmp}.old"
+            os.replace(target, old)
+            os.replace(tmp, target)
+            shutil.rmtree(old)
+        else:
+            os.replace(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+@once
+def load_network(name):
+    """Return graph ``name`` as a networkx.Graph.
+
+    Args:
+        name (str): One of ``GRAPHS``.
+    """
+    if os.path.isdir(graph_path(name)):
+        return load_graph(name).to_networkx()
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return pickle.load(f)
+
+
+@once
+def load_graph(name):
+    """Return graph ``name`` as a memory-mapped CSRGraph.
+
+    Args:
+        name (str): One of ``GRAPHS``.
+    """
+    if os.path.isdir(graph_path(name)):
+        return CSRGraph.load(graph_path(name))
+    return CSRGraph.from_networkx(load_network(name))
+
+
+def table_path(name):
+    """Return the Parquet file of table ``name``."""
+    return os.path.join(STORE_DIR, "tables", f"{name}.parquet")
+
+
+def _parse_list(value):
+    """Return the list a raw table cell spells out, or an empty list."""
+    parsed = ast.literal_eval(value) if isinstance(value, str) else None
+    return list(parsed or [])
+
+
+def read_raw_table(name):
+    """Return table ``name`` as stored in the original CSV or pickle.
+
+    The CSVs' unnamed index column is skipped while parsing, and the scalar
+    columns are given the dtypes in ``DTYPES``.
+
+    Args:
+        name (str): One of ``TABLES``.
+    """
+    if name == MOVIE_PLOTS:
+        with open(os.path.join(DATA_DIR, name), "rb") as f:
+            return pickle.load(f).astype(DTYPES[name])
+    return pd.read_csv(
+        os.path.join(DATA_DIR, f"{name}.csv"),
+        usecols=lambda column: not column.startswith("Unnamed: "),
+        dtype=DTYPES[name],
+    )
+
+
+def ingest_table(name):
+    """Return table ``name`` with its list columns parsed and counted.
+
+    Args:
+        name (str): One of ``TABLES``.
+    """
+    frame = read_raw_table(name)
+    for column in LIST_COLUMNS[name]:
+        frame[column] = frame[column].map(_parse_list)
+    return count_lists(name, frame)
+
+
+def count_lists(name, frame):
+    """Return ``frame`` with the ``n_<column>`` lengths of its list columns.
+
+    Args:
+        name (str): One of ``TABLES``, whose ``COUNTED_COLUMNS`` are counted.
+        frame (pd.DataFrame): Rows of the table with parsed list columns.
+    """
+    for column in COUNTED_COLUMNS.get(name, []):
+        frame[f"n_{column}"] = frame[column].map(len)
+    return frame
+
+
+@once
+def _ingested(name):
+    """Return ``ingest_table(name)``, parsed once per process."""
+    return ingest_table(name)
+
+
+@once
+def load_table(name, columns=None):
+    """Return table ``name``, or only some of its columns.
+
+    Parquet tables are memory-mapped and only the requested columns are
+    read. Numeric columns are handed to pandas as one block each, so Arrow
+    can release its buffers as they are converted instead of holding a
+    second copy of the table.
+
+    Args:
+        name (str): One of ``TABLES``.
+        columns (tuple): Columns to read, in order; all by default.
+    """
+    path = table_path(name)
+    if not os.path.exists(path):
+        frame = _ingested(name)
+        return frame if columns is None else frame[list(columns)]
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(
+        path,
+        columns=None if columns is None else list(columns),
+        memory_map=True,
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _columns(columns):
+    """Return ``columns`` as a hashable ``load_table`` key."""
+    return None if columns is None else tuple(columns)
+
+
+def film_data(columns=None):
+    """Return the film dataset.
+
+    Args:
+        columns (list): Columns to read; all by default.
+    """
+    return load_table(FILM_DATA, _columns(columns))
+
+
+@once
+def films_by_link():
+    """Return film titles and box office indexed by ``link``, one per link."""
+    films = film_data(["link", "title", "box_office"])
+    return films[~films["link"].duplicated()].set_index("link")
+
+
+# Name prefixes joined to the capitalised part after them, as in McGinley.
+NAME_PARTICLES = ("Mc", "Mac", "La", "Le")
+
+
+def split_name(label):
+    """Return an actor label with the spaces between its names put back.
+
+    Actor labels are names with the spaces removed, such as
+    ``"SamuelL.Jackson"``. A space goes before every capital following a
+    lower-case letter or a full stop, unless it follows a particle such as
+    "Mc".
+    """
+    words = [""]
+    for char in label:
+        word = words[-1]
+        if (
+            char.isupper()
+            and word
+            and (word[-1].islower() or word[-1] == ".")
+            and word not in NAME_PARTICLES
+        ):
+            words.append("")
+        words[-1] += char
+    return " ".join(words)
+
+
+@once
+def actor_names():
+    """Return the display name of every actor network label.
+
+    Actors who also direct, produce or write are spelt as in those columns
+    of the film dataset, which keep their spaces; other labels are split
+    with ``split_name``.
+    """
+    crew = film_data(["directors", "producers", "writers"])
+    names = pd.concat([crew[column].explode() for column in crew])
+    names = names.dropna().str.strip()
+    spelt = dict(zip(names.str.replace(" ", "", regex=False), names))
+    return {
+        label: spelt.get(label) or split_name(label)
+        for label in load_graph(ACTOR_NETWORK).nodes.tolist()
+    }
+
+
+def genre_tf_idf_data(columns=None):
+    """Return the top TF and TF-IDF words of each genre.
+
+    Args:
+        columns (list): Columns to read; all by default.
+    """
+    return load_table(GENRE_TF_IDF, _columns(columns))
+
+
+def movie_plots(columns=None):
+    """Return the movie plots with their sentiment scores.
+
+    Args:
+        columns (list): Columns to read; all by default.
+    """
+    return load_table(MOVIE_PLOTS, _columns(columns))
+
+
+def source_files():
+    """Return the raw data files everything else is derived from."""
+    tables = [
+        name if name == MOVIE_PLOTS else f"{name}.csv" for name in TABLES
+    ]
+    return [os.path.join(DATA_DIR, name) for name in GRAPHS + tables]
+
+
+def data_stamp():
+    """Return the size and modification time of every file data is read from.
+
+    Covers the raw files, the store built from them and its updates log.
+    """
+    paths = source_files() + [UPDATES_LOG]
+    paths += [table_path(name) for name in TABLES]
+    paths += [os.path.join(graph_path(name), "meta.json") for name in GRAPHS]
+    stamp = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stamp.append((path, None, None))
+        else:
+            stamp.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(stamp)
+
+
+def _hash_files(paths):
+    """Return a hash of the names and contents of ``paths``."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+_version = {"stamp": None, "hash": None}
+_version_lock = threading.Lock()
+
+
+def data_version():
+    """Return a hash of the raw data files, reloading data when they change.
+
+    Films added with ``updates.add_films`` are covered by hashing the
+    updates log along with the raw files.
+
+    The data files are stat'ed on every call, which is cheap, and the raw
+    files are only hashed again when a size or modification time differs
+    from the last call. Every ``once`` cache is then cleared, so loaders
+    read the new files and results keyed by the version are recomputed.
+    """
+    stamp = data_stamp()
+    with _version_lock:
+        if stamp != _version["stamp"]:
+            if _version["stamp"] is not None:
+                for function in _once_functions:
+                    function.cache_clear()
+            _version["stamp"] = stamp
+            paths = source_files()
+            if os.path.exists(UPDATES_LOG):
+                paths.append(UPDATES_LOG)
+            _version["hash"] = _hash_files(paths)
+        return _version["hash"]
+
+
+def build_store():
+    """Convert the pickled graphs and the raw tables into the store.
+
+    Films added since the last build are discarded with the updates log.
+    """
+    for name in GRAPHS:
+        with open(os.path.join(DATA_DIR, name), "rb") as f:
+            graph = CSRGraph.from_networkx(pickle.load(f))
+        save_graph(name, graph)
+        print(f"{name}: {len(graph)} nodes, {graph.number_of_edges()} edges")
+    build_tables()
+    if os.path.exists(UPDATES_LOG):
+        os.remove(UPDATES_LOG)
+
+
+def build_tables(names=TABLES):
+    """Ingest the raw tables ``names`` into the store."""
+    for name in names:
+        frame = ingest_table(name)
+        with atomic_write(table_path(name), "wb") as f:
+            frame.to_parquet(f, index=False)
+        print(f"{name}: {len(frame)} rows")
+
+
+if __name__ == "__main__":
+    build_store()
@@ -0,0 +1,213 @@
+"""Statistics of null-model ensembles matched to the networks.
+
+Instead of comparing a network against a single random graph, draw
+``samples`` seeded graphs from a null model, compute each one's statistics
+in a process pool and summarise them as mean, standard deviation and a 95%
+confidence interval of the mean. Summaries are stored in
+``data/store/ensembles`` keyed by model, size, parameters and seed range,
+so pages load them instantly; they never compute one. Precompute them
+with::
+
+    python src/ensembles.py --samples 32
+
+Pass ``--graph actor_network`` for ensembles matched to the actor network.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import graphstats
+import nullmodels
+from datastore import (
+    FILM_NETWORK,
+    GRAPHS,
+    STORE_DIR,
+    atomic_write,
+    load_graph,
+    once,
+)
+
+
+MODELS = {
+    "erdos_renyi": nullmodels.erdos_renyi_edges,
+    "watts_strogatz": nullmodels.watts_strogatz_edges,
+    "barabasi_albert": nullmodels.barabasi_albert_edges,
+}
+STATISTICS = [
+    "gcc_fraction",
+    "average_shortest_path",
+    "average_clustering",
+    "degree_assortativity",
+]
+SAMPLES = 32
+FIRST_SEED = 0
+
+
+def film_parameters(name=FILM_NETWORK):
+    """Return the null-model parameters matching graph ``name``.
+
+    Returns:
+        dict: Keyword arguments for each model in ``MODELS``, with ``n``
+        and the average degree taken from the loaded graph.
+    """
+    degrees = load_graph(name).degrees
+    n = len(degrees)
+    avg_k = float(degrees.mean())
+    p = avg_k / n
+    return {
+        "erdos_renyi": {"n": n, "p": p},
+        "watts_strogatz": {"n": n, "k": int(avg_k), "p": p},
+        "barabasi_albert": {"n": n, "m": 1},
+    }
+
+
+def sample(model, seed, **params):
+    """Return the edges of one seeded sample of ``model``."""
+    return MODELS[model](seed=seed, **params)
+
+
+def graph_statistics(graph):
+    """Return the ensemble statistics of one graph.
+
+    Path length and clustering are estimated on graphs too large to
+    measure exactly, see ``graphstats``.
+
+    Args:
+        graph (CSRGraph): The graph to measure.
+    """
+    import networkx as nx
+
+    gcc = graph.giant_component()
+    return {
+        "gcc_fraction": len(gcc) / len(graph),
+        "average_shortest_path": graphstats.average_shortest_path(gcc)[
+            "value"
+        ],
+        "average_clustering": graphstats.average_clustering(gcc)["value"],
+        "degree_assortativity": nx.degree_assortativity_coefficient(
+            graph.to_networkx()
+        ),
+    }
+
+
+def _sample_statistics(model, seed, params):
+    """Draw one sample of ``model`` and return its statistics."""
+    n = params["n"]
+    return graph_statistics(
+        nullmodels.to_graph(n, sample(model, seed, **params))
+    )
+
+
+def summarise(values):
+    """Return mean, standard deviation and 95% CI bounds of ``values``."""
+    values = np.asarray(values, dtype=float)
+    mean = values.mean()
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    margin = 1.96 * std / np.sqrt(len(values))
+    return {
+        "mean": mean,
+        "std": std,
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+    }
+
+
+def ensemble_path(model, params, samples, first_seed):
+    """Return the file an ensemble summary is stored in."""
+    key = "-".join(f"{k}{v:.6g}" for k, v in sorted(params.items()))
+    seeds = f"s{first_seed}-{first_seed + samples - 1}"
+    return os.path.join(STORE_DIR, "ensembles", f"{model}-{key}-{seeds}.json")
+
+
+def run_ensemble(
+    model, params, samples=SAMPLES, first_seed=FIRST_SEED, processes=None
+):
+    """Compute and store the summary statistics of an ensemble.
+
+    Args:
+        model (str): One of ``MODELS``.
+        params (dict): Keyword arguments of the model, including ``n``.
+        samples (int): Number of graphs drawn.
+        first_seed (int): Seed of the first graph; the rest follow it.
+        processes (int): Worker processes, all cores by default.
+    """
+    seeds = range(first_seed, first_seed + samples)
+    with ProcessPoolExecutor(processes) as pool:
+        rows = list(
+            pool.map(
+                _sample_statistics,
+                [model] * samples,
+                seeds,
+                [params] * samples,
+            )
+        )
+    summary = {
+        statistic: summarise([row[statistic] for row in rows])
+        for statistic in STATISTICS
+    }
+    with atomic_write(ensemble_path(model, params, samples, first_seed)) as f:
+        json.dump(
+            {
+                "model": model,
+                "params": params,
+                "seeds": [seeds.start, seeds.stop - 1],
+                "statistics": summary,
+            },
+            f,
+        )
+    return pd.DataFrame(summary).T
+
+
+def stored_ensemble_path(
+    model, samples=SAMPLES, first_seed=FIRST_SEED, name=FILM_NETWORK
+):
+    """Return the file the ensemble matched to graph ``name`` is stored in."""
+    params = film_parameters(name)[model]
+    return ensemble_path(model, params, samples, first_seed)
+
+
+@once
+def load_ensemble(
+    model, samples=SAMPLES, first_seed=FIRST_SEED, name=FILM_NETWORK
+):
+    """Return the stored summary of ``model`` matched to graph ``name``.
+
+    Returns:
+        pd.DataFrame: One row per statistic in ``STATISTICS`` with columns
+        ``mean``, ``std``, ``ci_low`` and ``ci_high``.
+
+    Raises:
+        FileNotFoundError: If the ensemble has not been built, see
+            ``build.py``.
+    """
+    path = stored_ensemble_path(model, samples, first_seed, name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No {model} ensemble stored at {path}; build it with"
+            " python src/build.py"
+        )
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)["statistics"]).T
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--model", choices=list(MODELS), nargs="+", default=list(MODELS)
+    )
+    parser.add_argument("--graph", choices=GRAPHS, default=FILM_NETWORK)
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    parser.add_argument("--first-seed", type=int, default=FIRST_SEED)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    for model in args.model:
+        params = film_parameters(args.graph)[model]
+        print(model, params)
+        print(
+            run_ensemble(
+                model, params, args.samples, args.first_seed, args.processes
+            )
+        )
@@ -0,0 +1,47 @@
+"""Export page tables to CSV files.
+
+Pages never write files. Run an export explicitly instead, from the
+repository root::
+
+    python src/export.py genre_centrality --output genre_centrality.csv
+
+Each file is written to a temporary file and renamed into place, so
+concurrent exports and readers never see a partial file.
+"""
+import argparse
+from datastore import atomic_write
+import network
+
+# Tables that can be exported, by name.
+EXPORTS = {
+    "genre_centrality": network.top_movies_degree_centrality,
+}
+
+
+def export(name, path):
+    """Write table ``name`` to ``path`` as CSV, atomically.
+
+    Args:
+        name (str): One of ``EXPORTS``.
+        path (str): File to write.
+    """
+    table = EXPORTS[name]()
+    with atomic_write(path) as f:
+        table.to_csv(f)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("table", choices=list(EXPORTS))
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="File to write; the table name by default.",
+    )
+    args = parser.parse_args()
+
+    table = export(args.table, args.output or args.table)
+    print(
+        f"{args.table}: {len(table)} rows written to {args.output or args.table}"
+    )
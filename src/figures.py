@@ -0,0 +1,178 @@
+"""Plotly traces whose size stays bounded as the data grows.
+
+Every value a trace holds is serialised into the page, so the charts bin
+their data on the server and ship the counts instead of the values. Bar
+traces are merged down to ``MAX_BINS`` bars, marker traces are thinned to
+``MAX_POINTS`` points and drawn with WebGL past ``WEBGL_POINTS`` so the
+browser does not lay out an SVG element per point.
+
+Report the largest payload of every prebuilt figure, largest first, with::
+
+    python src/build.py
+    python src/figures.py
+"""
+import argparse
+import base64
+import json
+import os
+import numpy as np
+import plotly.graph_objects as go
+from artifacts import artifact_dir, manifest
+from datastore import data_version
+
+# Most bars in one histogram trace.
+MAX_BINS = 200
+# Most points in one marker trace.
+MAX_POINTS = 2000
+# Marker traces with more points are drawn with WebGL.
+WEBGL_POINTS = 1000
+
+
+def coarsen(hist, edges, max_bins=MAX_BINS):
+    """Merge adjacent bins of a histogram until at most ``max_bins`` remain.
+
+    Args:
+        hist (np.ndarray): Count of every bin.
+        edges (np.ndarray): Bin edges, one more than ``hist``.
+        max_bins (int): Most bins to return.
+
+    Returns:
+        tuple: The merged counts and edges. Every merged bin covers the same
+        number of original bins, except perhaps the last.
+    """
+    hist = np.asarray(hist)
+    edges = np.asarray(edges)
+    width = -(-len(hist) // max_bins)
+    if width <= 1:
+        return hist, edges
+    starts = np.arange(0, len(hist), width)
+    return np.add.reduceat(hist, starts), np.append(edges[starts], edges[-1])
+
+
+def histogram_bar(hist, edges, integer=False, max_bins=MAX_BINS, **kwargs):
+    """Return a bar trace of a histogram of at most ``max_bins`` bars.
+
+    Args:
+        hist (np.ndarray): Count of every bin.
+        edges (np.ndarray): Bin edges, one more than ``hist``.
+        integer (bool): Whether the values are integers, such as degrees.
+            Bin ``[a, b)`` then holds the values ``a`` to ``b - 1`` and unit
+            bins are drawn at ``a``.
+        max_bins (int): Most bars; adjacent bins are merged beyond it.
+        **kwargs: Passed on to ``go.Bar``.
+    """
+    hist, edges = coarsen(hist, edges, max_bins)
+    widths = np.diff(edges)
+    if integer:
+        if (widths == 1).all():
+            return go.Bar(x=edges[:-1], y=hist, **kwargs)
+        x = edges[:-1] + (widths - 1) / 2
+    else:
+        x = edges[:-1] + widths / 2
+    return go.Bar(x=x, y=hist, width=widths, **kwargs)
+
+
+def markers(x, y, max_points=MAX_POINTS, **kwargs):
+    """Return a marker trace of at most ``max_points`` points.
+
+    Points are kept evenly spaced along the order given, so sorted values
+    thin out to their quantiles. Traces of over ``WEBGL_POINTS`` points are
+    ``go.Scattergl``.
+
+    Args:
+        x (sequence): Horizontal coordinates.
+        y (sequence): Vertical coordinates.
+        max_points (int): Most points to keep.
+        **kwargs: Passed on to the trace.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) > max_points:
+        keep = np.linspace(0, len(x) - 1, max_points).round().astype(int)
+        x, y = x[keep], y[keep]
+    trace = go.Scattergl if len(x) > WEBGL_POINTS else go.Scatter
+    return trace(x=x, y=y, mode="markers", **kwargs)
+
+
+def _length(values):
+    """Return the number of values in a JSON trace array."""
+    if isinstance(values, dict):
+        # A typed array, as newer Plotly versions write NumPy arrays.
+        size = len(base64.b64decode(values["bdata"]))
+        return size // np.dtype(values["dtype"]).itemsize
+    return len(values or ())
+
+
+def trace_points(data):
+    """Return the number of points in every trace of a figure's JSON.
+
+    Args:
+        data (list): The ``data`` of a figure as parsed from JSON.
+    """
+    return [
+        max(_length(trace.get(axis)) for axis in ("x", "y")) for trace in data
+    ]
+
+
+def payload_report(version=None):
+    """Return the largest payload of every prebuilt figure function.
+
+    Args:
+        version (str): A ``data_version``; the current data's by default.
+
+    Returns:
+        list: A dict per function, largest first, with its ``name``, the
+        number of ``calls`` built, and the payload ``bytes``, number of
+        ``traces`` and ``points`` in the largest trace of its largest call.
+    """
+    version = version or data_version()
+    directory = artifact_dir(version)
+    report = {}
+    for key, filename in manifest(version).items():
+        if not filename.endswith(".plotly.json"):
+            continue
+        name = key.rsplit("-", 1)[0]
+        path = os.path.join(directory, filename)
+        size = os.path.getsize(path)
+        row = report.setdefault(name, {"name": name, "calls": 0, "bytes": 0})
+        row["calls"] += 1
+        if size > row["bytes"]:
+            with open(path) as f:
+                points = trace_points(json.load(f).get("data", []))
+            row.update(
+                bytes=size, traces=len(points), points=max(points, default=0)
+            )
+    return sorted(report.values(), key=lambda row: row["bytes"], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--version",
+        default=None,
+        help="Build to report on; the current data hash by default.",
+    )
+    parser.add_argument(
+        "--max-kib",
+        type=float,
+        default=None,
+        help="exit with status 1 if any figure is larger",
+    )
+    args = parser.parse_args()
+
+    report = payload_report(args.version)
+    if not report:
+        parser.exit(1, "No prebuilt figures; run python src/build.py first.\n")
+    for row in report:
+        print(
+            f"{row['bytes'] / 1024:10.1f} KiB {row['traces']:4d} traces"
+            f" {row['points']:7d} points {row['calls']:4d} calls"
+            f"  {row['name']}"
+        )
+    too_large = [
+        row["name"]
+        for row in report
+        if args.max_kib is not None and row["bytes"] > args.max_kib * 1024
+    ]
+    if too_large:
+        parser.exit(1, f"Over {args.max_kib:g} KiB: {', '.join(too_large)}\n")
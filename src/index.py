@@ -1,41 +1,8 @@
+import contextlib
 import streamlit as st
-from constants import FILM_DATA
-from data import average_number_of, box_office_histogram
-from network import (
-    network_degree_distribution,
-    network_degree_distribution_by_box_office,
-    network_degree_distribution_by_genre,
-    network_degree_distribution_by_community,
-    render_actor_distribution_text,
-    render_movie_distribution_text,
-    render_box_office_distribution_text,
-    render_genre_distribution_text,
-    degree_distribution_comparison,
-    render_degree_distribution_comparison_text,
-    degree_centrality,
-    render_degree_centrality_text,
-    top_movies_degree_centrality,
-    additional_statistics,
-    er_comparison,
-    render_er_comparsion_text,
-    additional_statistics_text,
-)
-from wordclouds import (
-    render_word_clouds,
-    render_genre_tf_idf,
-    render_wordcloud_text,
-)
-from communities import (
-    community_size_distribution_graph,
-    community_box_office_histogram,
-    community_box_office_barchart,
-    render_community_text,
-)
-from sentiment import (
-    plot_sentiment_scores_by_box_office_group,
-    plot_sentiment_scores_by_genre,
-    plot_compound_scores,
-)
+import instrumentation
+from datastore import film_data
+from data import BINS, average_number_of, box_office_histogram, dataset_csv
 
 st.set_page_config(
     page_title="Box Office Films",
@@ -46,6 +13,21 @@ st.set_page_config(
 )
 
 
+@contextlib.contextmanager
+def stored_section():
+    """Show an error in place of a section whose stored results are missing.
+
+    Node metrics, the Louvain partition and the null-model ensembles are
+    only built offline, so on a fresh checkout their loaders raise
+    ``FileNotFoundError`` naming the command that builds them. The rest of
+    the page still renders.
+    """
+    try:
+        yield
+    except FileNotFoundError as error:
+        st.error(f"This section has not been built yet. {error}")
+
+
 def introduction():
     """Defines what will be shown on our introduction page."""
 
@@ -109,16 +91,17 @@ def data_analysis():
         "tokenization, and community. Try scrolling around and exploring the"
         " data for yourself!"
     )
+    film_dataset = film_data()
     selected_attributes = st.multiselect(
         "Select film attributes",
-        FILM_DATA.columns.values,
+        film_dataset.columns.values,
         [
-            FILM_DATA.columns.values[0],
-            FILM_DATA.columns.values[2],
-            FILM_DATA.columns.values[4],
+            film_dataset.columns.values[0],
+            film_dataset.columns.values[2],
+            film_dataset.columns.values[4],
         ],
     )
-    st.write(FILM_DATA[selected_attributes])
+    st.write(film_dataset[selected_attributes])
 
     "## Data Insights"
     f"The average number of actors is **{average_number_of('actors')}**"
@@ -127,13 +110,35 @@ def data_analysis():
     f"The average number of producers is **{average_number_of('producers')}**"
 
     "## Data Distribution"
-    bins = st.slider("Number of bins", min_value=3, max_value=200, value=60)
+    bins = st.slider(
+        "Number of bins", min_value=BINS[0], max_value=BINS[-1], value=60
+    )
     fig = box_office_histogram(bins=bins)
     st.plotly_chart(fig, use_container_width=True)
 
 
 def network_visualization():
     """Defines what should be shown on the network visualization page."""
+    from network import (
+        network_degree_distribution,
+        network_degree_distribution_by_box_office,
+        network_degree_distribution_by_genre,
+        network_degree_distribution_by_community,
+        render_actor_distribution_text,
+        render_movie_distribution_text,
+        render_box_office_distribution_text,
+        render_genre_distribution_text,
+        degree_distribution_comparison,
+        render_degree_distribution_comparison_text,
+        degree_centrality,
+        render_degree_centrality_text,
+        render_centrality_explorer,
+        top_movies_degree_centrality,
+        additional_statistics,
+        er_comparison,
+        render_er_comparsion_text,
+        additional_statistics_text,
+    )
 
     "# Network Analysis"
 
@@ -159,10 +164,12 @@ def network_visualization():
 
     "## Degree Distributions"
     st.plotly_chart(network_degree_distribution(type="film"))
-    render_movie_distribution_text()
+    with stored_section():
+        render_movie_distribution_text()
 
     st.plotly_chart(network_degree_distribution(type="actor"))
-    render_actor_distribution_text()
+    with stored_section():
+        render_actor_distribution_text()
 
     st.plotly_chart(network_degree_distribution_by_box_office())
     render_box_office_distribution_text()
@@ -177,22 +184,39 @@ def network_visualization():
     render_degree_distribution_comparison_text()
 
     "## Degree Centrality"
-    st.write(degree_centrality())
+    with stored_section():
+        st.write(degree_centrality())
     render_degree_centrality_text()
 
+    "### Explore the rankings"
+    (
+        "Pick a network, a metric and how many nodes to list. Movies can also"
+        " be narrowed down to a genre and a box office group."
+    )
+    with stored_section():
+        render_centrality_explorer()
+
     "### 5 most central movies for each genre according to degree centrality"
-    st.write(top_movies_degree_centrality())
+    with stored_section():
+        st.write(top_movies_degree_centrality())
 
     "## Additional Statistics"
-    additional_statistics()
+    with stored_section():
+        additional_statistics()
     additional_statistics_text()
 
-    st.write(er_comparison())
+    with stored_section():
+        st.write(er_comparison())
     render_er_comparsion_text()
 
 
 def word_clouds():
     """Defines what should be shown on the natural language processing page."""
+    from wordclouds import (
+        render_word_clouds,
+        render_genre_tf_idf,
+        render_wordcloud_text,
+    )
 
     "# Text analysis of movie plots"
 
@@ -228,11 +252,18 @@ def word_clouds():
 
 
 def communities():
+    """Defines what should be shown on the communities page."""
+    from communities import (
+        community_size_distribution_graph,
+        community_box_office_barchart,
+        render_community_text,
+    )
 
     render_community_text()
 
-    csd_graph = community_size_distribution_graph()
-    st.plotly_chart(csd_graph)
+    with stored_section():
+        csd_graph = community_size_distribution_graph()
+        st.plotly_chart(csd_graph)
 
     (
         "**Do larger communities make a bigger box office hit?**"
@@ -242,8 +273,9 @@ def communities():
         " communities include a lot of famous movie series this is reasonable."
     )
 
-    cbo_barchart = community_box_office_barchart()
-    st.plotly_chart(cbo_barchart)
+    with stored_section():
+        cbo_barchart = community_box_office_barchart()
+        st.plotly_chart(cbo_barchart)
 
     # cbo_histogram = community_box_office_histogram()
     # st.plotly_chart(cbo_histogram)
@@ -251,6 +283,11 @@ def communities():
 
 def sentiment_analysis():
     """Defines what should be shown on the sentiment analysis page."""
+    from sentiment import (
+        plot_sentiment_scores_by_box_office_group,
+        plot_sentiment_scores_by_genre,
+        plot_compound_scores,
+    )
 
     "# Sentiment Analysis"
 
@@ -303,45 +340,52 @@ def sentiment_analysis():
     "Regarding genres, the neutrality scores were still relatively big and similar through out all genres. However, genres like mystery, sci-fi, thriller, horror and romance stood out. The first four showed higher negativity scores and lower positivity scores. This makes complete sense, it is hard to imagine a horror or mystery movie showcasing positivity. It carries the opposite purpose. It is similar for romantic movies. Even though romantic movies can have bitersweet moments or endings it usually has a fairly positive and uplifting storyline. These movies are for dreaming and this requires positivity."
 
 
-def main():
-    """Entry point for the application."""
+def diagnostics():
+    """Defines what should be shown on the diagnostics page."""
 
-    st.sidebar.title("Top Box Office Films")
-    page = st.sidebar.radio(
-        "Sections",
-        [
-            "Introduction",
-            "Basic Stats",
-            "Network Analysis",
-            "Text Analysis",
-            "Communities Analysis",
-            "Sentiment Analysis",
-        ],
-    )
-    st.sidebar.download_button(
-        "Download data",
-        data=FILM_DATA.to_csv().encode("utf-8"),
-        file_name="movie_dataset.csv",
+    "# Diagnostics"
+    (
+        "Latency, calls and result sizes of the instrumented functions in this"
+        " process, with the hits and misses of the result cache and the data"
+        " loaders, slowest first. They are also written to"
+        f" `{instrumentation.prometheus_file()}` every"
+        f" {instrumentation.INTERVAL} seconds."
     )
-    link = "[Notebook](https://colab.research.google.com/drive/1kB3vDGY3Js_ex5OzXbJN9jb7qjJTkaoM?usp=sharing)"
-    st.sidebar.markdown(link, unsafe_allow_html=True)
-    if page == "Introduction":
-        introduction()
+    st.dataframe(instrumentation.summary(), use_container_width=True)
 
-    if page == "Basic Stats":
-        data_analysis()
 
-    if page == "Network Analysis":
-        network_visualization()
+# Sidebar sections and the functions rendering them. A page imports its
+# module the first time it is shown, so no page waits for another's data.
+PAGES = {
+    "Introduction": introduction,
+    "Basic Stats": data_analysis,
+    "Network Analysis": network_visualization,
+    "Text Analysis": word_clouds,
+    "Communities Analysis": communities,
+    "Sentiment Analysis": sentiment_analysis,
+}
+# Only listed while instrumentation is on.
+if instrumentation.ENABLED:
+    PAGES["Diagnostics"] = diagnostics
 
-    if page == "Text Analysis":
-        word_clouds()
 
-    if page == "Communities Analysis":
-        communities()
+def main():
+    """Entry point for the application."""
 
-    if page == "Sentiment Analysis":
-        sentiment_analysis()
+    st.sidebar.title("Top Box Office Films")
+    page = st.sidebar.radio("Sections", list(PAGES))
+    # The CSV is only built once a reader asks for it, not on every page.
+    if st.sidebar.checkbox("Download data"):
+        st.sidebar.download_button(
+            "Download CSV",
+            data=dataset_csv().encode("utf-8"),
+            file_name="movie_dataset.csv",
+        )
+    link = "[Notebook](https://colab.research.google.com/drive/1kB3vDGY3Js_ex5OzXbJN9jb7qjJTkaoM?usp=sharing)"
+    st.sidebar.markdown(link, unsafe_allow_html=True)
+    instrumentation.start_exporter()
+    with instrumentation.timed(f"index.{PAGES[page].__name__}"):
+        PAGES[page]()
 
 
 if __name__ == "__main__":
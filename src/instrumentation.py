@@ -0,0 +1,312 @@
+"""Timings, call counts and result sizes of the app's hot path.
+
+Off unless the ``APP_INSTRUMENT`` environment variable is set to anything
+but ``0``. When off, ``instrumented`` returns functions unchanged and
+``timed`` does nothing, so the app pays for no more than a flag check.
+When on, every ``cache.cached`` and ``datastore.once`` function, page
+render and ``instrumented`` function records its latency in a histogram
+along with its call and error counts and the size of its results.
+``cache.stats`` and ``datastore.once_stats`` add the cache hits and misses
+of each function.
+
+The figures are shown on a hidden "Diagnostics" page, listed in the sidebar
+only while instrumentation is on, and written every ``INTERVAL`` seconds in
+the Prometheus text format to ``prometheus_file``, for a node exporter's
+textfile collector to scrape.
+
+``datastore`` times its loaders with this module, so this module imports
+``datastore`` only inside the functions that need it.
+"""
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("APP_INSTRUMENT", "0") not in ("", "0")
+INTERVAL = 15
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+
+class _Series:
+    """Latencies and result sizes of one function."""
+
+    def __init__(self):
+        # One count per bucket, and a last one for slower calls.
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.seconds = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.result_bytes = 0
+        self.sized = 0
+
+
+# Series of this process, by function.
+_series = {}
+_lock = threading.Lock()
+
+
+def record(name, seconds, size=None, error=False):
+    """Record one call of function ``name``.
+
+    Args:
+        name (str): Qualified name of the function.
+        seconds (float): How long the call took.
+        size (int): Size of the result in bytes, if known.
+        error (bool): Whether the call raised.
+    """
+    with _lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = _Series()
+        series.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        series.seconds += seconds
+        series.calls += 1
+        series.errors += error
+        if size is not None:
+            series.result_bytes += size
+            series.sized += 1
+
+
+def result_size(value):
+    """Return the size in bytes of ``value``, or None if unknown.
+
+    Covers bytes, text, NumPy arrays and pandas objects, whose size is
+    cheap to read; cached results are measured by their pickled size.
+    """
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage if isinstance(usage, int) else usage.sum())
+    return None
+
+
+@contextlib.contextmanager
+def timed(name):
+    """Record the time spent in the ``with`` block as a call of ``name``.
+
+    Yields:
+        dict: Set its ``"size"`` to record the size of the result in bytes.
+    """
+    call = {}
+    if not ENABLED:
+        yield call
+        return
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        record(name, time.perf_counter() - start, error=True)
+        raise
+    record(name, time.perf_counter() - start, call.get("size"))
+
+
+def instrumented(func):
+    """Record the latency and result size of every call of ``func``."""
+    if not ENABLED:
+        return func
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed(name) as call:
+            result = func(*args, **kwargs)
+            call["size"] = result_size(result)
+        return result
+
+    return wrapper
+
+
+def _quantile(series, q):
+    """Estimate quantile ``q`` of the latencies from the histogram.
+
+    Interpolates linearly within the bucket the quantile falls in, like
+    Prometheus' ``histogram_quantile``.
+    """
+    rank = q * series.calls
+    seen = 0
+    for i, count in enumerate(series.buckets):
+        if count and seen + count >= rank:
+            low = BUCKETS[i - 1] if i > 0 else 0.0
+            high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            return low + (high - low) * (rank - seen) / count
+        seen += count
+    return 0.0
+
+
+def prometheus_file():
+    """Return the file ``write_prometheus`` writes to by default.
+
+    ``APP_INSTRUMENT_FILE``, or ``instrumentation.prom`` in the store.
+    """
+    from datastore import STORE_DIR
+
+    return os.environ.get(
+        "APP_INSTRUMENT_FILE", os.path.join(STORE_DIR, "instrumentation.prom")
+    )
+
+
+def cache_counts():
+    """Return the hits and misses of every cache, by function.
+
+    Merges ``cache.stats``, which also counts backend errors, with
+    ``datastore.once_stats``.
+    """
+    from cache import stats
+    from datastore import once_stats
+
+    return {**stats(), **once_stats()}
+
+
+def summary():
+    """Return one row of timings and cache counts per function.
+
+    Returns:
+        pd.DataFrame: Calls, errors, mean, median and 95th percentile
+        milliseconds, mean result KiB, and cache hits, misses and hit rate,
+        indexed by function and sorted by total time.
+    """
+    import pandas as pd
+
+    with _lock:
+        rows = {
+            name: {
+                "calls": s.calls,
+                "errors": s.errors,
+                "total_s": s.seconds,
+                "mean_ms": 1000 * s.seconds / s.calls,
+                "p50_ms": 1000 * _quantile(s, 0.5),
+                "p95_ms": 1000 * _quantile(s, 0.95),
+                "result_kib": s.result_bytes / s.sized / 1024
+                if s.sized
+                else None,
+            }
+            for name, s in _series.items()
+        }
+    for name, counts in cache_counts().items():
+        row = rows.setdefault(name, {})
+        row.update(counts)
+        lookups = counts["hits"] + counts["misses"]
+        row["hit_rate"] = counts["hits"] / lookups if lookups else None
+    frame = pd.DataFrame.from_dict(rows, orient="index")
+    if "total_s" in frame:
+        frame = frame.sort_values("total_s", ascending=False)
+    return frame
+
+
+def _label(value):
+    """Return ``value`` escaped for a Prometheus label."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text():
+    """Return every series in the Prometheus text exposition format."""
+    lines = [
+        "# HELP app_function_seconds Latency of instrumented functions.",
+        "# TYPE app_function_seconds histogram",
+    ]
+    with _lock:
+        series = sorted(_series.items())
+        for name, s in series:
+            function = f'function="{_label(name)}"'
+            total = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), s.buckets):
+                total += count
+                lines.append(
+                    f'app_function_seconds_bucket{{{function},le="{bound}"}}'
+                    f" {total}"
+                )
+            lines.append(f"app_function_seconds_sum{{{function}}} {s.seconds}")
+            lines.append(f"app_function_seconds_count{{{function}}} {s.calls}")
+        lines += [
+            "# HELP app_function_errors_total Calls that raised.",
+            "# TYPE app_function_errors_total counter",
+        ]
+        lines += [
+            f'app_function_errors_total{{function="{_label(name)}"}}'
+            f" {s.errors}"
+            for name, s in series
+        ]
+        lines += [
+            "# HELP app_function_result_bytes Size of returned results.",
+            "# TYPE app_function_result_bytes summary",
+        ]
+        for name, s in series:
+            function = f'function="{_label(name)}"'
+            lines.append(
+                f"app_function_result_bytes_sum{{{function}}} {s.result_bytes}"
+            )
+            lines.append(
+                f"app_function_result_bytes_count{{{function}}} {s.sized}"
+            )
+    lines += [
+        "# HELP app_cache_requests_total Cache lookups by outcome.",
+        "# TYPE app_cache_requests_total counter",
+    ]
+    for name, counts in sorted(cache_counts().items()):
+        for event, count in counts.items():
+            lines.append(
+                f'app_cache_requests_total{{function="{_label(name)}",'
+                f'result="{event}"}} {count}'
+            )
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """Write ``prometheus_text`` to ``path``, or ``prometheus_file``."""
+    from datastore import atomic_write
+
+    with atomic_write(path or prometheus_file()) as f:
+        f.write(prometheus_text())
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(interval=INTERVAL):
+    """Write the Prometheus file every ``interval`` seconds.
+
+    Starts a daemon thread once per process, and only while instrumentation
+    is on, so serving a page never waits on the file.
+    """
+    global _exporter
+    if not ENABLED:
+        return
+    with _exporter_lock:
+        if _exporter is not None:
+            return
+
+        def export():
+            while True:
+                time.sleep(interval)
+                try:
+                    write_prometheus()
+                except OSError:
+                    pass
+
+        _exporter = threading.Thread(
+            target=export, name="prometheus-exporter", daemon=True
+        )
+        _exporter.start()
@@ -1,25 +1,30 @@
 import streamlit as st
-import ast
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from constants import ACTOR_NETWORK, FILM_NETWORK, BOX_OFFICE_GROUPS, FILM_DATA
+from constants import BOX_OFFICE_GROUPS
+from datastore import (
+    ACTOR_NETWORK,
+    FILM_NETWORK,
+    actor_names,
+    film_data,
+    load_graph,
+    load_network,
+    once,
+)
+from centrality import load_metrics, top_by_group
+from queries import node_metrics
 import networkx as nx
-import random
+from histograms import grouped_histograms, membership_matrix
+import nullmodels
+import graphstats
+from artifacts import materialize
+from cache import cached
+from figures import histogram_bar
+from instrumentation import instrumented
+from ensembles import FIRST_SEED, film_parameters, load_ensemble, sample
 import pandas as pd
 
-temp = list(set(FILM_DATA["genres"].values))
-movie_genres = [
-    value for sublist in temp for value in ast.literal_eval(sublist)
-]
-movie_genres_set = list(set(movie_genres))
-genre_list = []
-
-for genre in movie_genres_set:
-    genre_list.append(genre.replace(" ", ""))
-
-genre_list = np.sort(list(set(genre_list)))
-genre_list = list(genre_list)
 small_genres = [
     "War",
     "Sport",
@@ -31,11 +36,20 @@ small_genres = [
     "Documentary",
 ]
 
-for genre in small_genres:
-    genre_list.remove(genre)
 
+@once
+def genre_list():
+    """Return the genres of the film dataset, without spaces and sorted.
 
-@st.cache
+    Genres in ``small_genres`` are left out.
+    """
+    genres = film_data(["genres"])["genres"].explode().dropna()
+    genres = np.sort(genres.str.replace(" ", "").unique())
+    return [genre for genre in genres if genre not in small_genres]
+
+
+@cached
+@materialize({"type": "film"}, {"type": "actor"})
 def network_degree_distribution(type="film"):
 
     if type not in ["film", "actor"]:
@@ -45,21 +59,17 @@ def network_degree_distribution(type="film"):
     fig = go.Figure()
 
     if type == "film":
-        degree_distribution = [
-            FILM_NETWORK.degree(n) for n in FILM_NETWORK.nodes()
-        ]
+        degree_distribution = load_graph(FILM_NETWORK).degrees
         fig.update_layout(title_text="Degree distribution of the film network")
     else:
-        degree_distribution = [
-            ACTOR_NETWORK.degree(n) for n in ACTOR_NETWORK.nodes()
-        ]
+        degree_distribution = load_graph(ACTOR_NETWORK).degrees
         fig.update_layout(
             title_text="Degree distribution of the actors network"
         )
     hist, bins = np.histogram(
         degree_distribution, bins=np.arange(max(degree_distribution) + 1)
     )
-    fig.add_trace(go.Bar(x=bins[:-1], y=hist))
+    fig.add_trace(histogram_bar(hist, bins, integer=True))
     fig.update_layout(
         xaxis_title="Node degree",
         yaxis_title="Frequency",
@@ -67,20 +77,24 @@ def network_degree_distribution(type="film"):
     return fig
 
 
-@st.cache
+@cached
+@materialize()
 def network_degree_distribution_by_box_office():
+    film_graph = load_graph(FILM_NETWORK)
     fig = make_subplots(rows=5, cols=1, shared_xaxes=True, shared_yaxes=True)
 
-    for i, group in enumerate(BOX_OFFICE_GROUPS):
-        degree_distribution = []
-        for n in FILM_NETWORK.nodes():
-            if FILM_NETWORK.nodes[n]["bo_group"] == group:
-                degree_distribution.append(FILM_NETWORK.degree(n))
-
-        hist, bins = np.histogram(
-            degree_distribution, bins=np.arange(max(degree_distribution) + 1)
+    membership = membership_matrix(
+        film_graph.attribute("bo_group"), BOX_OFFICE_GROUPS
+    )
+    histograms = grouped_histograms(
+        film_graph.degrees, membership, bins="integer"
+    )
+    for i, (group, (hist, bins)) in enumerate(
+        zip(BOX_OFFICE_GROUPS, histograms)
+    ):
+        fig.add_trace(
+            histogram_bar(hist, bins, integer=True, name=group), i + 1, 1
         )
-        fig.add_trace(go.Bar(x=bins[:-1], y=hist, name=group), i + 1, 1)
 
     fig.update_xaxes(title_text="Degree", row=5, col=1)
     fig.update_yaxes(title_text="Frequency", row=4, col=1)
@@ -91,19 +105,18 @@ def network_degree_distribution_by_box_office():
     return fig
 
 
-@st.cache
+@cached
+@materialize()
 def network_degree_distribution_by_genre():
+    film_graph = load_graph(FILM_NETWORK)
     fig = make_subplots(rows=7, cols=2, shared_xaxes=True)
 
-    for i, genre in enumerate(genre_list):
-        degree_distribution = []
-        for n in FILM_NETWORK.nodes():
-            if genre in FILM_NETWORK.nodes[n]["genre"]:
-                degree_distribution.append(FILM_NETWORK.degree(n))
-
+    genres = genre_list()
+    membership = membership_matrix(film_graph.attribute("genre"), genres)
+    histograms = grouped_histograms(film_graph.degrees, membership, bins=30)
+    for i, (genre, (hist, bins)) in enumerate(zip(genres, histograms)):
         b = (i % 2) + 1
         a = (i // 2) + 1
-        hist, bins = np.histogram(degree_distribution, bins=30)
         fig.add_trace(go.Bar(x=bins[:-1], y=hist, name=genre), a, b)
 
     fig.update_xaxes(title_text="Degree", row=7, col=1)
@@ -114,22 +127,27 @@ def network_degree_distribution_by_genre():
     )
     return fig
 
-@st.cache
+@cached
+@materialize()
 def network_degree_distribution_by_community():
-    community_list = list(set(FILM_DATA["community"].values))
+    film_graph = load_graph(FILM_NETWORK)
+    community_list = list(set(film_data(["community"])["community"].values))
 
     fig = make_subplots(rows=3, cols=2, shared_xaxes=True, shared_yaxes=True)
+    membership = membership_matrix(
+        film_graph.attribute("community"), community_list
+    )
+    histograms = grouped_histograms(film_graph.degrees, membership, bins=30)
+    # The six largest communities of over 50 films, one per panel, in order.
+    sizes = membership.sum(axis=0)
+    largest = set(np.argsort(-sizes, kind="stable")[:6])
     counter = 0
-    for i, community in enumerate(community_list):
-        degree_distribution = []
-        for n in FILM_NETWORK.nodes():
-            if community == FILM_NETWORK.nodes[n]["community"]:
-                degree_distribution.append(FILM_NETWORK.degree(n))
-
-        if len(degree_distribution) > 50:
+    for i, (community, size, (hist, bins)) in enumerate(
+        zip(community_list, sizes, histograms)
+    ):
+        if size > 50 and i in largest:
             b = (counter % 2) + 1
             a = (counter // 2) + 1
-            hist, bins = np.histogram(degree_distribution, bins=30)
             fig.add_trace(
                 go.Bar(x=bins[:-1], y=hist, name=str(community)), a, b
             )
@@ -143,77 +161,56 @@ def network_degree_distribution_by_community():
     )
     return fig
 
-def add_new_nodes(network, amount):
-    edge_list = flat_edge_list(network)
-    next_node = max(edge_list) + 1
-    network.add_edge(random.choice(edge_list), next_node)
-    next_node += 1
-
-    for i in range(amount-1):
-        edge_list = flat_edge_list(network)
-        network.add_edge(random.choice(edge_list), next_node)
-        next_node += 1
-
-    return network
-
-def flat_edge_list(network):
-
-    edge_list = []
 
-    for n1,n2 in list(network.edges()):
-        edge_list.append(n1)
-        edge_list.append(n2)
-
-    return edge_list
-
-@st.cache
+@cached
+@materialize()
 def degree_distribution_comparison():
-    #Create a list of network names and a list of their respective degree distributions
-    types = ['Movie Network','Barabasi-Albert Network','Watts Strogatz Network','Erdős-Rényi Network']
+    # Create a list of network names and a list of their respective degree
+    # distributions
+    types = [
+        "Movie Network",
+        "Barabasi-Albert Network",
+        "Watts Strogatz Network",
+        "Erdős-Rényi Network",
+    ]
     degree_distributions = []
 
-    #We get the degree distribution of our movie network and add it to the list
-    degree_distribution_movies = [FILM_NETWORK.degree(n) for n in FILM_NETWORK.nodes()]
+    # We get the degree distribution of our movie network and add it to the
+    # list
+    degree_distribution_movies = load_graph(FILM_NETWORK).degrees
     degree_distributions.append(degree_distribution_movies)
 
-    #We get the degree distribution of a Barabasi-Albert network with the same amount of nodes.
-    #The distribution is added to the list
-    BA = nx.Graph()
-    BA.add_edge(1,2)
-    BA = add_new_nodes(BA,712)
-    degree_distribution = [BA.degree(n) for n in BA.nodes()]
-    degree_distributions.append(degree_distribution)
-
-    #We get the degree distribution for the Watts Strogatz network with the same amount of nodes.
-    #The distribution is added to the list
-    degree_distribution = [FILM_NETWORK.degree(n) for n in FILM_NETWORK.nodes()]
-    avg_k = sum(degree_distribution)/len(degree_distribution)
-    p = avg_k/(len(list(FILM_NETWORK.nodes())))
-    WSG = nx.watts_strogatz_graph(n=713, k=int(avg_k), p=p)
-    WSG_degree_distribution = [WSG.degree(n) for n in WSG.nodes()]
-    degree_distributions.append(WSG_degree_distribution)
-
-    #We get the degree distribution of the Erdős-Rényi network with the same amount of nodes.
-    #The distribution is added to the list
-    ER = nx.gnp_random_graph(713,p)
-    degree_distribution = [ER.degree(n) for n in ER.nodes()]
-    degree_distributions.append(degree_distribution)
+    # We get the degree distributions of Barabasi-Albert, Watts Strogatz and
+    # Erdős-Rényi networks with the same amount of nodes and average degree.
+    # Each is the first graph of the model's ensemble, so it is the same ER
+    # graph the statistics below are drawn from.
+    parameters = film_parameters()
+    for model in ["barabasi_albert", "watts_strogatz", "erdos_renyi"]:
+        edges = sample(model, FIRST_SEED, **parameters[model])
+        degree_distributions.append(
+            nullmodels.degree_sequence(parameters[model]["n"], edges)
+        )
 
     fig = make_subplots(rows=4, cols=1, shared_xaxes=True, shared_yaxes=True)
 
     for i, distribution in enumerate(degree_distributions):
 
-        b = (i%2) +1
-        a = (i//2) +1
-        hist, bins = np.histogram(distribution, bins = np.arange(max(distribution)+1))
-        fig.add_trace(go.Bar(x=bins[:-1], y=hist,name=types[i]),i+1,1)
+        b = (i % 2) + 1
+        a = (i // 2) + 1
+        hist, bins = np.histogram(
+            distribution, bins=np.arange(max(distribution) + 1)
+        )
+        fig.add_trace(
+            histogram_bar(hist, bins, integer=True, name=types[i]), i + 1, 1
+        )
 
-    fig.update_xaxes(title_text="Degree", row = i+1, col = 1)
-    fig.update_yaxes(title_text="Frequency", row = 1, col = 1)
+    fig.update_xaxes(title_text="Degree", row=i + 1, col=1)
+    fig.update_yaxes(title_text="Frequency", row=1, col=1)
     fig.update_layout(title_text="Degree distributions for different networks")
 
     return fig
 
+
 def render_degree_distribution_comparison_text():
     st.write(f"The degree distribution of the movie network is compared to the degree distributions"
     " of other networks. These networks were produced with the same amount of nodes and similar statistics"
@@ -234,28 +231,29 @@ def render_actor_distribution_text():
     st.text("")
 
     st.write(f"5 actors with the most connections:")
-    st.write(f"*  Samuel L. Jackson")
-    st.write(f"*  Idris Elba")
-    st.write(f"* Dwayne Johnson")
-    st.write(f"* Tyler Perry")
-    st.write(f"* Kevin Hart")
+    actors = node_metrics(ACTOR_NETWORK)
+    names = actor_names()
+    most = [names[actor] for actor in actors.top_k("degree", 5).index]
+    least = [names[actor] for actor in actors.top_k("degree", 5, lowest=True).index]
+    for actor in most:
+        st.write(f"* {actor}")
 
     st.text("")
     st.write(f"5 actors with the least connections:")
-    st.write(f"* Clint Eastwood")
-    st.write(f"* Chaney Kley")
-    st.write(f"* Emma Caulfield")
-    st.write(f"* Israel Broussard")
-    st.write(f"* Jessica Rothe")
-
-    st.write(f"Regarding, the lists. It could be expected that Samuel L. Jackson would be one of the most"
-    " connected actors. He is known for his good acting and his uniqueness. He appeared in many Marvel movies"
-    " and films directed by Quentin Tarantino. This fact alone makes the actor very well known. Dwayne Johnson"
-    " could also be expected to appear in such a list. He's been very active the past years appearing in many"
-    " 'Casual' movies. What is suprising is Clint Eastwood appearing as an actor with the top5 least connections."
-    " He is a legend is widely known for his famous roles. However, even though he is still quite involved in "
-    " workng with cinema his prime years are long gone. Now Clint Eastwood carefully chooses his projects appearing"
-    " in movies every few years or so.")
+    for actor in least:
+        st.write(f"* {actor}")
+
+    # The discussion was written about these ranks, so it is left out when
+    # the data ranks other actors.
+    if {"Samuel L. Jackson", "Dwayne Johnson"} <= set(most) and "Clint Eastwood" in least:
+        st.write(f"Regarding, the lists. It could be expected that Samuel L. Jackson would be one of the most"
+        " connected actors. He is known for his good acting and his uniqueness. He appeared in many Marvel movies"
+        " and films directed by Quentin Tarantino. This fact alone makes the actor very well known. Dwayne Johnson"
+        " could also be expected to appear in such a list. He's been very active the past years appearing in many"
+        " 'Casual' movies. What is suprising is Clint Eastwood appearing as an actor with the top5 least connections."
+        " He is a legend is widely known for his famous roles. However, even though he is still quite involved in "
+        " workng with cinema his prime years are long gone. Now Clint Eastwood carefully chooses his projects appearing"
+        " in movies every few years or so.")
 
 def render_movie_distribution_text():
     st.write(f"The degree distribution illustrates how movies are sharing actors among them. No single value stands"
@@ -265,30 +263,29 @@ def render_movie_distribution_text():
 
     st.text("")
     st.write(f"The 5 movies with the most connections / actors that are heavily casted for other movies as well:")
-    st.write(f"* Avengers: Age of Ultron")
-    st.write(f"* The Other Guys")
-    st.write(f"* Avengers: Endgame")
-    st.write(f"* Avengers: Infinity War")
-    st.write(f"* The Avengers")
+    movies = node_metrics(FILM_NETWORK)
+    most = list(movies.top_k("degree", 5).index)
+    least = list(movies.top_k("degree", 5, lowest=True).index)
+    for movie in most:
+        st.write(f"* {movie}")
 
     st.text("")
     st.write(f"The 5 movies with the least connections / actors that are rarely selected for oher movies:")
-    st.write(f"* Boogeyman")
-    st.write(f"* Come Play")
-    st.write(f"* Darkness Falls")
-    st.write(f"* Friday the 13th")
-    st.write(f"* Gran Torino")
+    for movie in least:
+        st.write(f"* {movie}")
 
     st.text("")
-    st.write(f"So it can be seen that Marvel studios chose widely casted actors or made their cast members a very"
-    " popular option for others. Marvel are making big budget movies, producing huge amounts of revenue, so it makes"
-    " sense they are also choosing the popular/good actors. The Other Guys is also coming in strong. This movie has "
-    " actors like Will Ferell, Mark Wahlberg, Dwayne Johnson and Samuel L. Jackson. These are huge names in the industry."
-    " For the movies with the least connections we see some interesting things. 4 out of 5 of the listed movies are horror"
-    " movies, which is quite interesting. This means that horror movies might cast less known actors. We can also see Gran"
-    " Torino appearing in the list. This is the movie from Clint Eastwood, where he was the director and the main actor. "
-    " We saw before that Clint Eastwood had 0 connections in the actor's network. We saw Samuel L. Jackson and Dwanye Johnson"
-    " in the top 5 of the actor's network degree distribution.")
+    # As for the actors, the discussion only fits the ranks it was written about.
+    if "The Other Guys" in most and "Gran Torino" in least:
+        st.write(f"So it can be seen that Marvel studios chose widely casted actors or made their cast members a very"
+        " popular option for others. Marvel are making big budget movies, producing huge amounts of revenue, so it makes"
+        " sense they are also choosing the popular/good actors. The Other Guys is also coming in strong. This movie has "
+        " actors like Will Ferell, Mark Wahlberg, Dwayne Johnson and Samuel L. Jackson. These are huge names in the industry."
+        " For the movies with the least connections we see some interesting things. 4 out of 5 of the listed movies are horror"
+        " movies, which is quite interesting. This means that horror movies might cast less known actors. We can also see Gran"
+        " Torino appearing in the list. This is the movie from Clint Eastwood, where he was the director and the main actor. "
+        " We saw before that Clint Eastwood had 0 connections in the actor's network. We saw Samuel L. Jackson and Dwanye Johnson"
+        " in the top 5 of the actor's network degree distribution.")
 
 def render_box_office_distribution_text():
     st.write(f"Above we have the degree distributions for the movie network. They are "
@@ -307,53 +304,114 @@ def render_genre_distribution_text():
         " connections. Otherwise, adventure, sci-fi and crime movies seem to have more popular"
         " cast members.")
 
+@cached
+@materialize()
 def degree_centrality():
+    metrics = node_metrics(FILM_NETWORK)
     df_centrality = pd.DataFrame()
 
-    # Find the 5 most central movies according to degree centrality.
-    movie_degree_centrality = nx.degree_centrality(FILM_NETWORK)
-    sortedDict = dict(sorted(movie_degree_centrality.items(), key=lambda x: x[1], reverse=True)[:5])
-    sortedDict = {k: round(v, 4) for k, v in sortedDict.items()}
-    df_centrality['Degree Centrality'] = sortedDict.keys()
-    df_centrality['Degree Centrality Value'] = sortedDict.values()
-
-    # Find the 5 most central movies according to betweenness centrality.
-    movie_betweeness_centrality = nx.betweenness_centrality(FILM_NETWORK, endpoints=True)
-    sortedDict = dict(sorted(movie_betweeness_centrality.items(), key=lambda x: x[1], reverse=True)[:5])
-    sortedDict = {k: round(v, 4) for k, v in sortedDict.items()}
-    df_centrality['Betweenness Centrality'] = sortedDict.keys()
-    df_centrality['Betweenness Centrality Value'] = sortedDict.values()
-
-    # Find the 5 most central characters according to eigenvector centrality.
-    movie_eigenvector_centrality = nx.eigenvector_centrality(FILM_NETWORK)
-    sortedDict = dict(sorted(movie_eigenvector_centrality.items(), key=lambda x: x[1], reverse=True)[:5])
-    sortedDict = {k: round(v, 4) for k, v in sortedDict.items()}
-    df_centrality['Eigenvector Centrality'] = sortedDict.keys()
-    df_centrality['Eigenvector Centrality Value'] = sortedDict.values()
+    # Find the 5 most central movies according to each precomputed metric.
+    for metric, column in [
+        ("degree", "Degree Centrality"),
+        ("betweenness", "Betweenness Centrality"),
+        ("eigenvector", "Eigenvector Centrality"),
+    ]:
+        top = metrics.top_k(metric, 5).round(4)
+        df_centrality[column] = top.index
+        df_centrality[column + " Value"] = top.values
 
     return df_centrality
 
 
+@cached
+@materialize()
 def top_movies_degree_centrality():
-    df_centrality_genres = pd.DataFrame()
-    movie_degree_centrality = nx.degree_centrality(FILM_NETWORK)
+    metrics = load_metrics(FILM_NETWORK)
+    genres = pd.Series(
+        list(load_graph(FILM_NETWORK).attribute("genre")), index=metrics.index
+    )
 
     # Find the 5 most central movies for each genre according to degree centrality.
-    for i,genre in enumerate(genre_list):
-        genre_nodes = [x for x,y in FILM_NETWORK.nodes(data=True) if genre in y['genre']]
-        genre_movie_degree_centrality = { key: movie_degree_centrality[key] for key in genre_nodes}
+    top = top_by_group(metrics["degree"], genres, k=5).round(4)
+    # A genre with no film in the network keeps an empty column.
+    none = pd.Series(dtype=float)
+    df_centrality_genres = pd.DataFrame(
+        {
+            genre: pd.Series(
+                [
+                    f"{movie} : {value}"
+                    for movie, value in top.get(genre, none).items()
+                ],
+                dtype=object,
+            )
+            for genre in genre_list()
+        }
+    )
 
-        sortedDict = dict(sorted(genre_movie_degree_centrality.items(), key=lambda x: x[1], reverse=True)[:5])
-        sortedDict = {k: round(v, 4) for k, v in sortedDict.items()}
-        df_centrality_genres[genre] = sortedDict.keys()
-        df_centrality_genres['value'] = sortedDict.values()
+    return df_centrality_genres
 
-        df_centrality_genres[genre] = df_centrality_genres[genre] + ' : ' +  df_centrality_genres["value"].astype(str)
 
-    df_centrality_genres.drop(['value'], axis=1).to_csv("genre_centrality")
-    df_centrality_genres.drop(['value'], axis=1)
+# Metrics the centrality explorer offers, with their display names.
+METRIC_NAMES = {
+    "degree": "Degree Centrality",
+    "betweenness": "Betweenness Centrality",
+    "eigenvector": "Eigenvector Centrality",
+    "closeness": "Closeness Centrality",
+    "pagerank": "PageRank",
+    "average_neighbor_degree": "Average Neighbour Degree",
+}
+
+
+@instrumented
+def node_ranking(name, metric, k=5, lowest=False, **filters):
+    """Return the ``k`` highest or lowest ranked nodes of graph ``name``.
+
+    Answered from the indexed node metrics, so no graph algorithm runs.
+
+    Args:
+        name (str): FILM_NETWORK or ACTOR_NETWORK.
+        metric (str): One of ``METRIC_NAMES``.
+        k (int): Number of nodes.
+        lowest (bool): Rank from the lowest value up.
+        **filters: Attribute values the nodes must have, such as ``genre``
+            or ``bo_group`` for the film network.
+    """
+    top = node_metrics(name).top_k(metric, k, lowest=lowest, **filters)
+    names = top.index
+    if name == ACTOR_NETWORK:
+        names = names.map(actor_names())
+    return pd.DataFrame(
+        {"Name": names, METRIC_NAMES[metric]: top.values.round(4)}
+    )
 
-    return df_centrality_genres
+
+def render_centrality_explorer():
+    """Render widgets ranking the nodes of either network by any metric."""
+    col1, col2, col3 = st.columns(3)
+    network = col1.selectbox("Network", ["Film", "Actor"])
+    metric = col2.selectbox(
+        "Metric", list(METRIC_NAMES), format_func=METRIC_NAMES.get
+    )
+    k = col3.slider("Number of nodes", min_value=1, max_value=50, value=10)
+
+    filters = {}
+    if network == "Film":
+        col1, col2 = st.columns(2)
+        genre = col1.selectbox("Genre", ["All"] + genre_list())
+        bo_group = col2.selectbox(
+            "Box office group", ["All"] + BOX_OFFICE_GROUPS
+        )
+        if genre != "All":
+            filters["genre"] = genre
+        if bo_group != "All":
+            filters["bo_group"] = bo_group
+    name = FILM_NETWORK if network == "Film" else ACTOR_NETWORK
+
+    col1, col2 = st.columns(2)
+    col1.write(f"Highest {METRIC_NAMES[metric].lower()}")
+    col1.write(node_ranking(name, metric, k, **filters))
+    col2.write(f"Lowest {METRIC_NAMES[metric].lower()}")
+    col2.write(node_ranking(name, metric, k, lowest=True, **filters))
 
 
 def render_degree_centrality_text():
@@ -398,35 +456,32 @@ def render_degree_centrality_text():
     " This is one of the earlier Marvel movies starring Robert Downey Jr., Don Cheadle, Mickey Rourke, Samuel L. Jackson, Scarlett Johansson"
     " and so on. ")
 
-def additional_statistics():
-    # Returns the average degree of the neighborhood of each node.
-    stats = nx.average_neighbor_degree(FILM_NETWORK)
+@cached
+@materialize()
+def top_average_neighbor_degree():
+    # The 5 movies whose neighbours have the highest average degree.
+    top = node_metrics(FILM_NETWORK).top_k("average_neighbor_degree", 5)
+    return top.index.tolist()
 
+def additional_statistics():
     st.write(f"Movies with the highest average neighbour degree")
 
-    st.write(sorted(stats, key=stats.get, reverse=True)[:5])
+    st.write(top_average_neighbor_degree())
 
-def er_comparison():
-    #Extracting the biggest component from the movie graph to compute some of the statistics
-    degree_distribution = [FILM_NETWORK.degree(n) for n in FILM_NETWORK.nodes()]
-    avg_k = sum(degree_distribution)/len(degree_distribution)
-    p = avg_k/(len(list(FILM_NETWORK.nodes())))
-    ER = nx.gnp_random_graph(713,p)
-    Gcc = sorted(nx.connected_components(FILM_NETWORK), key=len, reverse=True)
-    H_gcc = FILM_NETWORK.subgraph(Gcc[0])
+@cached
+@materialize()
+def er_comparison(name=FILM_NETWORK):
+    network = load_network(name)
+    # Path length and clustering are measured on the giant component, exactly
+    # on small graphs and from a sample with a 95% CI on large ones.
+    gcc = load_graph(name).giant_component()
 
-    Gcc = sorted(nx.connected_components(ER), key=len, reverse=True)
-    ER_gcc = ER.subgraph(Gcc[0])
+    # The ER statistics are summarised over a seeded ensemble of ER graphs
+    # with the same number of nodes and average degree as the network.
+    ER = load_ensemble("erdos_renyi", name=name)
 
-    avg_shortest_path = nx.average_shortest_path_length(H_gcc)
-    avg_clustering = nx.average_clustering(FILM_NETWORK)
-    movies_avg_clustering = nx.average_clustering(FILM_NETWORK)
-    gcc_avg_clustering = nx.average_clustering(H_gcc)
-
-    ER_avg_shortest_path = nx.average_shortest_path_length(ER_gcc)
-    ER_avg_clustering = nx.average_clustering(ER)
-    ER_movies_avg_clustering = nx.average_clustering(ER)
-    ER_gcc_avg_clustering = nx.average_clustering(ER_gcc)
+    avg_shortest_path = graphstats.average_shortest_path(gcc)
+    gcc_avg_clustering = graphstats.average_clustering(gcc)
 
 
     df_other_statistics = pd.DataFrame()
@@ -439,26 +494,44 @@ def er_comparison():
     ]
 
     values = [
-        nx.degree_assortativity_coefficient(FILM_NETWORK),
-        nx.attribute_assortativity_coefficient(FILM_NETWORK,'bo_group'),
-        nx.attribute_assortativity_coefficient(FILM_NETWORK,'community'),
-        avg_shortest_path,
-        gcc_avg_clustering
+        nx.degree_assortativity_coefficient(network),
+        attribute_assortativity(network, 'bo_group'),
+        attribute_assortativity(network, 'community'),
+        avg_shortest_path["value"],
+        gcc_avg_clustering["value"]
     ]
-    er_values = [
-        nx.degree_assortativity_coefficient(ER),
-        np.nan,
-        np.nan,
-        ER_avg_shortest_path,
-        ER_gcc_avg_clustering
+    estimates = [None, None, None, avg_shortest_path, gcc_avg_clustering]
+    er_statistics = [
+        "degree_assortativity",
+        None,
+        None,
+        "average_shortest_path",
+        "average_clustering",
     ]
 
     df_other_statistics['Metric'] = statistics
     df_other_statistics['MN Value'] = values
-    df_other_statistics['ER Value'] = er_values
+    df_other_statistics['ER Value'] = [
+        ER["mean"][s] if s else np.nan for s in er_statistics
+    ]
+    df_other_statistics['ER 95% CI'] = [
+        f"{ER['ci_low'][s]:.4f} - {ER['ci_high'][s]:.4f}" if s else ""
+        for s in er_statistics
+    ]
+    if any(e and e["samples"] for e in estimates):
+        df_other_statistics['MN 95% CI'] = [
+            f"{e['ci_low']:.4f} - {e['ci_high']:.4f}" if e and e["samples"] else ""
+            for e in estimates
+        ]
 
     return df_other_statistics
 
+def attribute_assortativity(network, attribute):
+    """Return the assortativity of ``attribute``, or NaN if a node lacks it."""
+    if not all(attribute in data for _, data in network.nodes(data=True)):
+        return np.nan
+    return nx.attribute_assortativity_coefficient(network, attribute)
+
 def render_er_comparsion_text():
     st.write(f"Here we compare some of the statistics to that of the ER network. This is because we wanted to share some"
     " reference point and the Erdős-Rényi network had the most similar degree distribution. Note, it is just for reference"
@@ -0,0 +1,139 @@
+"""Seeded random graph generators for comparing against the film network.
+
+Every generator returns its edges as a pair of endpoint arrays in time
+linear in the number of nodes plus edges, so degree sequences of
+million-node null models can be drawn without building a networkx graph.
+Use ``degree_sequence`` for the degrees alone, or ``to_graph`` when the
+whole graph is needed.
+"""
+import numpy as np
+from datastore import CSRGraph
+
+
+def barabasi_albert_edges(n, m=1, seed=None):
+    """Return the edges of a Barabási–Albert preferential attachment graph.
+
+    Growth starts from a star on ``m + 1`` nodes. Every new node attaches
+    to ``m`` distinct existing nodes chosen with probability proportional
+    to their degree, by sampling uniformly from an append-only array
+    holding both endpoints of every edge so far.
+
+    Args:
+        n (int): Number of nodes.
+        m (int): Edges added with each new node.
+        seed (int): Seed for the random number generator.
+    """
+    if not 1 <= m < n:
+        raise ValueError(f"Expecting 1 <= m < n, but received m={m}, n={n}")
+    rng = np.random.default_rng(seed)
+    sources = list(range(1, m + 1))
+    targets = [0] * m
+    endpoints = sources + targets
+
+    draws = rng.random(n * m).tolist()
+    d = 0
+    for node in range(m + 1, n):
+        chosen = set()
+        while len(chosen) < m:
+            if d == len(draws):
+                draws = rng.random(n * m).tolist()
+                d = 0
+            chosen.add(endpoints[int(draws[d] * len(endpoints))])
+            d += 1
+        for target in chosen:
+            sources.append(node)
+            targets.append(target)
+            endpoints.append(node)
+            endpoints.append(target)
+    return np.asarray(sources), np.asarray(targets)
+
+
+def erdos_renyi_edges(n, p, seed=None):
+    """Return the edges of a G(n, p) Erdős–Rényi random graph.
+
+    The edge count is drawn from its binomial distribution and that many
+    distinct node pairs are then sampled, so the cost grows with the number
+    of edges rather than with the ``n * (n - 1) / 2`` candidate pairs.
+
+    Args:
+        n (int): Number of nodes.
+        p (float): Probability of each edge.
+        seed (int): Seed for the random number generator.
+    """
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) // 2
+    count = rng.binomial(pairs, p)
+    index = rng.choice(pairs, size=count, replace=False)
+    # Pair index k = v * (v - 1) / 2 + w with w < v.
+    v = np.floor((1 + np.sqrt(1 + 8 * index.astype(np.float64))) / 2)
+    v = v.astype(np.int64)
+    v[v * (v - 1) // 2 > index] -= 1
+    v[v * (v + 1) // 2 <= index] += 1
+    w = index - v * (v - 1) // 2
+    return w, v
+
+
+def watts_strogatz_edges(n, k, p, seed=None):
+    """Return the edges of a Watts–Strogatz small-world graph.
+
+    Starts from a ring where each node is joined to its ``k // 2`` nearest
+    neighbours on either side, then rewires each edge's far end with
+    probability ``p`` to a uniformly chosen node, avoiding self-loops and
+    duplicate edges, as ``nx.watts_strogatz_graph`` does.
+
+    Args:
+        n (int): Number of nodes.
+        k (int): Each node's number of ring neighbours.
+        p (float): Probability of rewiring each edge.
+        seed (int): Seed for the random number generator.
+    """
+    if k >= n:
+        raise ValueError(f"Expecting k < n, but received k={k}, n={n}")
+    rng = np.random.default_rng(seed)
+    half = k // 2
+    sources = np.repeat(np.arange(n), half)
+    targets = (sources + np.tile(np.arange(1, half + 1), n)) % n
+
+    rewire = np.flatnonzero(rng.random(len(sources)) < p)
+    if len(rewire):
+        existing = set(
+            (
+                np.minimum(sources, targets) * n + np.maximum(sources, targets)
+            ).tolist()
+        )
+        degrees = np.bincount(np.concatenate([sources, targets]), minlength=n)
+        for e in rewire.tolist():
+            u, v = int(sources[e]), int(targets[e])
+            if degrees[u] >= n - 1:
+                continue
+            w = int(rng.integers(n))
+            while w == u or min(u, w) * n + max(u, w) in existing:
+                w = int(rng.integers(n))
+            existing.discard(min(u, v) * n + max(u, v))
+            existing.add(min(u, w) * n + max(u, w))
+            degrees[v] -= 1
+            degrees[w] += 1
+            targets[e] = w
+    return sources, targets
+
+
+def degree_sequence(n, edges):
+    """Return the degree of each of the ``n`` nodes as a NumPy array.
+
+    Args:
+        n (int): Number of nodes.
+        edges (tuple): Source and target endpoint arrays.
+    """
+    sources, targets = edges
+    return np.bincount(np.concatenate([sources, targets]), minlength=n)
+
+
+def to_graph(n, edges):
+    """Return the edges as a CSRGraph on nodes ``0 .. n - 1``.
+
+    Args:
+        n (int): Number of nodes.
+        edges (tuple): Source and target endpoint arrays.
+    """
+    sources, targets = edges
+    return CSRGraph.from_edges(np.arange(n), sources, targets)
@@ -0,0 +1,194 @@
+"""Multi-core shortest-path metrics over memory-mapped CSR graphs.
+
+Source nodes are split into chunks and handed to a process pool. Workers
+never receive the graph itself: they memory-map the CSR arrays from the
+graph's store directory, so the adjacency is shared through the page cache
+instead of being pickled to every process, and search it a level at a time
+with NumPy, gathering each level's neighbours straight from the mapped
+arrays. Partial results are summed in chunk order by the parent.
+
+Betweenness follows networkx's Brandes implementation and normalisation,
+and the average shortest path length sums the same distances, so both
+match ``nx.betweenness_centrality`` and
+``nx.average_shortest_path_length`` up to floating-point summation order.
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from datastore import CSRGraph
+
+
+# CSR arrays memory-mapped by this worker process, keyed by store directory and
+# the identity of its adjacency file, so a replaced graph is read again.
+_graphs = {}
+
+
+def _graph_key(path):
+    """Return the key of the graph stored at ``path`` in ``_graphs``."""
+    stat = os.stat(os.path.join(path, "indices.npy"))
+    return path, stat.st_ino, stat.st_mtime_ns
+
+
+def _csr(path):
+    """Return the memory-mapped ``indptr`` and ``indices`` at ``path``.
+
+    Neighbour lists are sliced out of the shared arrays as they are visited,
+    so no worker holds a copy of the adjacency.
+    """
+    key = _graph_key(path)
+    if key not in _graphs:
+        graph = CSRGraph.load(path)
+        _graphs[key] = graph.indptr, graph.indices
+    return _graphs[key]
+
+
+def _edges_from(indptr, indices, frontier):
+    """Return the (source, target) arrays of every edge leaving ``frontier``.
+
+    The targets are gathered from ``indices`` with one fancy index, so the
+    neighbour lists are never copied out one node at a time.
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    sources = np.repeat(frontier, counts)
+    offsets = np.arange(counts.sum()) + np.repeat(
+        starts - (np.cumsum(counts) - counts), counts
+    )
+    return sources, indices[offsets]
+
+
+def _betweenness_chunk(path, sources, endpoints):
+    """Return the unscaled betweenness contributed by ``sources``."""
+    indptr, indices = _csr(path)
+    n = len(indptr) - 1
+    betweenness = np.zeros(n)
+    for s in sources:
+        # Breadth-first search counting shortest paths a level at a time,
+        # keeping the edges that lie on a shortest path from ``s``.
+        distance = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        distance[s] = 0
+        sigma[s] = 1.0
+        frontier = np.array([s])
+        levels = []
+        depth = 0
+        while len(frontier):
+            v, w = _edges_from(indptr, indices, frontier)
+            depth += 1
+            frontier = np.unique(w[distance[w] < 0])
+            distance[frontier] = depth
+            on_path = distance[w] == depth
+            v, w = v[on_path], w[on_path]
+            sigma += np.bincount(w, weights=sigma[v], minlength=n)
+            levels.append((v, w))
+
+        # Back-propagate dependencies in order of decreasing distance.
+        delta = np.zeros(n)
+        for v, w in reversed(levels):
+            delta += np.bincount(
+                v, weights=sigma[v] / sigma[w] * (1 + delta[w]), minlength=n
+            )
+        delta[s] = 0.0
+        betweenness += delta
+        if endpoints:
+            reached = distance > 0
+            betweenness[reached] += 1
+            betweenness[s] += np.count_nonzero(reached)
+    return betweenness
+
+
+def _distance_chunk(path, sources):
+    """Return the summed distances from ``sources`` and the pairs reached."""
+    indptr, indices = _csr(path)
+    n = len(indptr) - 1
+    total = 0
+    reached = 0
+    for s in sources:
+        seen = np.zeros(n, dtype=bool)
+        seen[s] = True
+        frontier = np.array([s])
+        depth = 0
+        while len(frontier):
+            depth += 1
+            w = _edges_from(indptr, indices, frontier)[1]
+            frontier = np.unique(w[~seen[w]])
+            seen[frontier] = True
+            total += depth * len(frontier)
+            reached += len(frontier)
+    return total, reached
+
+
+def _map_sources(graph, task, args, processes):
+    """Run ``task`` over chunks of source nodes and return the results."""
+    processes = processes or os.cpu_count()
+    chunks = np.array_split(np.arange(len(graph)), processes * 4)
+    chunks = [chunk.tolist() for chunk in chunks if len(chunk)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = graph.path
+        if path is None:
+            # Give the workers something to memory-map.
+            path = os.path.join(tmp, "graph")
+            graph.save(path)
+        if processes == 1:
+            results = [task(path, chunk, *args) for chunk in chunks]
+            if path != graph.path:
+                del _graphs[_graph_key(path)]
+            return results
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(task, path, c, *args) for c in chunks]
+            return [future.result() for future in futures]
+
+
+def betweenness_centrality(
+    graph, normalized=True, endpoints=False, processes=None
+):
+    """Return the betweenness centrality of every node.
+
+    Args:
+        graph (CSRGraph): The graph to measure.
+        normalized (bool): Scale as ``nx.betweenness_centrality`` does.
+        endpoints (bool): Count path endpoints as lying on the path.
+        processes (int): Worker processes, all cores by default.
+
+    Returns:
+        np.ndarray: Betweenness aligned with ``graph.nodes``.
+    """
+    partials = _map_sources(graph, _betweenness_chunk, (endpoints,), processes)
+    betweenness = np.zeros(len(graph))
+    for partial in partials:
+        betweenness += partial
+
+    n = len(graph)
+    if not normalized:
+        scale = 0.5
+    elif endpoints:
+        scale = 1 / (n * (n - 1)) if n >= 2 else None
+    else:
+        scale = 1 / ((n - 1) * (n - 2)) if n > 2 else None
+    if scale is not None:
+        betweenness *= scale
+    return betweenness
+
+
+def average_shortest_path_length(graph, processes=None):
+    """Return the average shortest path length of a connected graph.
+
+    Args:
+        graph (CSRGraph): The graph to measure.
+        processes (int): Worker processes, all cores by default.
+    """
+    import networkx as nx
+
+    n = len(graph)
+    if n == 0:
+        raise nx.NetworkXPointlessConcept("null graph has no paths")
+    if n == 1:
+        return 0
+    partials = _map_sources(graph, _distance_chunk, (), processes)
+    total = sum(partial[0] for partial in partials)
+    reached = sum(partial[1] for partial in partials)
+    if reached != n * (n - 1):
+        raise nx.NetworkXError("Graph is not connected.")
+    return total / (n * (n - 1))
@@ -0,0 +1,157 @@
+"""Persisted Louvain partitions of the film community network.
+
+A partition is computed once per graph content, resolution and seed, and
+written to ``data/store/partitions``. Pages only read the file and fail if
+it is missing. The tables the Communities page is drawn from join the film
+titles and box office to it when it is loaded, so they follow changes to
+the film table that leave the graph alone. Rebuild it offline with::
+
+    python src/partitions.py --resolution 1.0 --seed 0
+"""
+
+import argparse
+import json
+import os
+import pandas as pd
+from datastore import (
+    FILM_NETWORK_COMMUNITY,
+    STORE_DIR,
+    atomic_write,
+    films_by_link,
+    load_graph,
+    once,
+)
+
+RESOLUTION = 1.0
+SEED = 0
+TABLES = [
+    "partition",
+    "communities",
+    "community_sizes",
+    "community_names",
+    "community_box_office",
+    "community_total_box_office",
+]
+
+
+def partition_path(graph_hash, resolution=RESOLUTION, seed=SEED):
+    """Return the file a partition is stored in."""
+    return os.path.join(
+        STORE_DIR,
+        "partitions",
+        f"{graph_hash[:16]}-r{resolution:g}-s{seed}.json",
+    )
+
+
+def stored_partition_path(resolution=RESOLUTION, seed=SEED):
+    """Return the file the partition of the loaded graph is stored in."""
+    graph_hash = load_graph(FILM_NETWORK_COMMUNITY).content_hash()
+    return partition_path(graph_hash, resolution, seed)
+
+
+def community_tables(graph, partition):
+    """Return the tables derived from a partition of the community network.
+
+    Every table comes from one frame of (link, community, degree) rows
+    joined once against the films indexed by link, so the cost is linear in
+    the number of nodes.
+
+    Args:
+        graph (CSRGraph): The film community network.
+        partition (dict): Maps each node to its community number.
+    """
+    frame = pd.DataFrame(
+        {"link": list(partition), "community": list(partition.values())}
+    ).sort_values("link", kind="stable")
+    frame["degree"] = frame["link"].map(
+        pd.Series(graph.degrees, index=graph.nodes)
+    )
+    frame = frame.join(
+        films_by_link()[["title", "box_office"]], on="link", how="left"
+    )
+    frame["title"] = frame["title"].fillna(frame["link"])
+
+    grouped = frame.groupby("community", sort=False)
+    aggregates = grouped.agg(
+        size=("link", "size"), total_box_office=("box_office", "sum")
+    )
+    aggregates["mean_box_office"] = (
+        aggregates["total_box_office"] / aggregates["size"]
+    )
+    names = (
+        frame.drop_duplicates(["community", "title"])
+        .sort_values("degree", ascending=False, kind="stable")
+        .groupby("community", sort=False)
+        .head(3)
+        .groupby("community", sort=False)["title"]
+        .agg(list)
+    )
+    sizes = aggregates["size"].sort_values(ascending=False, kind="stable")
+
+    def table(series):
+        return {int(k): v for k, v in series.reindex(aggregates.index).items()}
+
+    return {
+        "partition": partition,
+        "communities": table(grouped["link"].agg(list)),
+        "community_sizes": {int(k): int(v) for k, v in sizes.items()},
+        "community_names": table(names),
+        "community_box_office": table(aggregates["mean_box_office"]),
+        "community_total_box_office": table(aggregates["total_box_office"]),
+    }
+
+
+def build_partition(resolution=RESOLUTION, seed=SEED):
+    """Run Louvain on the community network and store the result."""
+    from community import community_louvain
+
+    csr = load_graph(FILM_NETWORK_COMMUNITY)
+    # Built from the CSR arrays so the node and neighbour order, and with it
+    # the partition for a given seed, do not depend on how the graph was
+    # loaded.
+    graph = csr.to_networkx()
+    partition = community_louvain.best_partition(
+        graph, resolution=resolution, random_state=seed
+    )
+    with atomic_write(
+        partition_path(csr.content_hash(), resolution, seed)
+    ) as f:
+        # Stored as key/value pairs so integer keys and order survive JSON.
+        json.dump({"partition": list(partition.items())}, f)
+    return community_tables(csr, partition)
+
+
+@once
+def load_partition(resolution=RESOLUTION, seed=SEED):
+    """Return the tables of the stored partition.
+
+    Returns:
+        dict: The tables listed in ``TABLES``, as returned by
+        ``community_tables`` for the current film table.
+
+    Raises:
+        FileNotFoundError: If the partition of the loaded graph has not
+            been built, see ``build.py``.
+    """
+    path = stored_partition_path(resolution, seed)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No Louvain partition stored at {path}; build it with"
+            " python src/build.py"
+        )
+    with open(path) as f:
+        partition = dict(json.load(f)["partition"])
+    return community_tables(load_graph(FILM_NETWORK_COMMUNITY), partition)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolution", type=float, default=RESOLUTION)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    tables = build_partition(args.resolution, args.seed)
+    print(
+        f"{len(tables['communities'])} communities,"
+        f" largest {list(tables['community_sizes'].values())[:5]}"
+    )
@@ -0,0 +1,127 @@
+"""Report the import time and memory of the app's modules on a cold start.
+
+``index.py`` always imports the modules in ``BASE_MODULES`` and imports a
+page's module only when the page is first shown. This script imports each
+of them in a fresh interpreter, the way a new server process would: the
+base modules from nothing, and every module in ``build.PAGE_MODULES`` on
+top of the base modules. It reports the seconds each import took and how
+much the process's peak resident memory grew.
+
+Reports are written to ``--output`` and compared with ``--baseline`` when
+given, exiting with status 1 if any import regressed by more than
+``--tolerance``. Run from the repository root::
+
+    python src/profile_imports.py --output startup.json
+    python src/profile_imports.py --baseline startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from build import PAGE_MODULES
+
+# Modules index.py imports before any page is shown.
+BASE_MODULES = ["streamlit", "instrumentation", "datastore", "data"]
+# Smallest changes reported as regressions, whatever the tolerance.
+FLOORS = {"seconds": 0.05, "rss_kib": 1024}
+
+_PROBE = """
+import importlib, json, resource, sys, time
+sys.path.insert(0, {src!r})
+for name in {preload!r}:
+    importlib.import_module(name)
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+seconds = time.perf_counter() - start
+growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+print(json.dumps({{"seconds": seconds, "rss_kib": growth}}))
+"""
+
+
+def profile(modules, preload=()):
+    """Return the cost of importing ``modules`` in a fresh interpreter.
+
+    Args:
+        modules (list): Modules imported and measured, in order.
+        preload (list): Modules imported first and not measured.
+
+    Returns:
+        dict: The ``seconds`` the imports took and the growth of peak
+        resident memory in KiB, ``rss_kib``.
+    """
+    code = _PROBE.format(
+        src=os.path.dirname(os.path.abspath(__file__)),
+        preload=list(preload),
+        modules=list(modules),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def startup_report():
+    """Return the cold import cost of the base modules and of every page.
+
+    Returns:
+        dict: Maps ``"base"`` and each other module in ``PAGE_MODULES`` to
+        the result of ``profile``.
+    """
+    report = {"base": profile(BASE_MODULES)}
+    for module in PAGE_MODULES:
+        if module not in BASE_MODULES:
+            report[module] = profile([module], BASE_MODULES)
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Return the imports that regressed against ``baseline``.
+
+    Returns:
+        list: A ``(module, measurement, baseline, result)`` tuple per
+        regression.
+    """
+    regressions = []
+    for module, before in baseline.items():
+        after = report.get(module)
+        if after is None:
+            continue
+        for key, floor in FLOORS.items():
+            limit = max(before[key] * (1 + tolerance), before[key] + floor)
+            if after[key] > limit:
+                regressions.append((module, key, before[key], after[key]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="JSON file to write the report to")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = startup_report()
+    print(f"{'module':<12} {'seconds':>8} {'peak RSS':>10}")
+    for module, cost in report.items():
+        print(
+            f"{module:<12} {cost['seconds']:8.3f}"
+            f" {cost['rss_kib'] / 1024:7.1f} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for module, key, before, after in regressions:
+            print(f"regression {module} {key}: {before} -> {after}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
@@ -0,0 +1,168 @@
+"""Build the film and actor networks from the film table's cast lists.
+
+The cast lists form a sparse film x actor incidence matrix ``B``. Films
+sharing an actor are the non-zero off-diagonal entries of ``B @ B.T`` and
+co-stars those of ``B.T @ B``, so both one-mode projections come out of one
+sparse product each, already in the CSR layout the store uses, instead of a
+Python loop over pairs. Node attributes are copied over as whole columns.
+
+Build both networks from ``dataset.csv`` and write them to the store with::
+
+    python src/projections.py --save
+"""
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from datastore import (
+    ACTOR_NETWORK,
+    FILM_NETWORK,
+    CSRGraph,
+    film_data,
+    save_graph,
+)
+
+# Film network node attributes and the film table columns they come from.
+FILM_ATTRIBUTES = {
+    "genre": "genres",
+    "bo_group": "bo_group",
+    "community": "community",
+}
+
+
+def incidence_matrix(films, casts):
+    """Return the film x actor incidence matrix of the cast lists.
+
+    Args:
+        films (sequence): The film of each cast list. Repeated films are
+            merged into one row.
+        casts (sequence): The list of actors of each film.
+
+    Returns:
+        tuple: The film labels, the actor labels and a ``csr_matrix`` with a
+        1 wherever the actor plays in the film.
+    """
+    from scipy.sparse import csr_matrix
+
+    rows, film_labels = pd.factorize(pd.Series(list(films), dtype=object))
+    lengths = np.fromiter((len(cast) for cast in casts), dtype=np.int64)
+    actors = pd.Series(
+        list(itertools.chain.from_iterable(casts)), dtype=object
+    )
+    columns, actor_labels = pd.factorize(actors)
+    matrix = csr_matrix(
+        (
+            np.ones(len(columns), dtype=np.int32),
+            (np.repeat(rows, lengths), columns),
+        ),
+        shape=(len(film_labels), len(actor_labels)),
+    )
+    # An actor listed twice in a cast still links each pair once.
+    matrix.data[:] = 1
+    return np.asarray(film_labels), np.asarray(actor_labels), matrix
+
+
+def projection(nodes, incidence, attributes=None):
+    """Return the graph linking rows of ``incidence`` that share a column.
+
+    Args:
+        nodes (np.ndarray): The label of each row.
+        incidence (csr_matrix): Rows by shared items, such as films by
+            actors.
+        attributes (dict): Maps attribute name to an array of node values.
+    """
+    adjacency = (incidence @ incidence.T).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.sort_indices()
+    return CSRGraph(
+        np.asarray(nodes, dtype=str),
+        adjacency.indptr.astype(np.int64),
+        adjacency.indices.astype(np.int32),
+        attributes,
+    )
+
+
+def projection_blocks(incidence, transposed, rows):
+    """Yield the adjacency of ``projection`` a block of rows at a time.
+
+    Only one block of the product is held in memory, for projections too
+    large to build at once.
+
+    Args:
+        incidence (csr_matrix): Rows by shared items.
+        transposed (csr_matrix): ``incidence.T`` in CSR layout.
+        rows (int): Rows per block.
+
+    Yields:
+        csr_matrix: The next ``rows`` rows of the adjacency matrix, with
+        sorted indices and without self-loops.
+    """
+    for start in range(0, incidence.shape[0], rows):
+        block = (incidence[start : start + rows] @ transposed).tocsr()
+        block.setdiag(0, k=start)
+        block.eliminate_zeros()
+        block.sort_indices()
+        yield block
+
+
+def film_attributes(table, films):
+    """Return the film network attributes of ``films`` from ``table``."""
+    first = table.drop_duplicates("title").set_index("title").loc[films]
+    genres = np.empty(len(first), dtype=object)
+    for i, value in enumerate(first["genres"]):
+        genres[i] = list(value)
+    return {
+        "genre": genres,
+        "bo_group": first["bo_group"]
+        .astype(object)
+        .where(first["bo_group"].notna(), "")
+        .to_numpy(dtype=str),
+        # Stored as int64 like the film table, with -1 for no community.
+        "community": first["community"].fillna(-1).to_numpy(dtype=np.int64),
+    }
+
+
+def build_networks(table=None):
+    """Return the film and actor networks of the film table.
+
+    Films are linked when they share an actor and actors when they play in
+    the same film. Every film and actor in ``table`` becomes a node, in
+    order of first appearance.
+
+    Args:
+        table (pd.DataFrame): The film table, with at least ``title`` and
+            ``actors`` columns; the stored one by default.
+
+    Returns:
+        dict: The ``CSRGraph`` of ``FILM_NETWORK`` and ``ACTOR_NETWORK``.
+    """
+    if table is None:
+        table = film_data(
+            ["title", "actors", "genres", "bo_group", "community"]
+        )
+    films, actors, incidence = incidence_matrix(
+        table["title"], table["actors"]
+    )
+    attributes = None
+    if set(FILM_ATTRIBUTES.values()) <= set(table.columns):
+        attributes = film_attributes(table, films)
+    return {
+        FILM_NETWORK: projection(films, incidence, attributes),
+        ACTOR_NETWORK: projection(actors, incidence.T.tocsr()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="replace the stored networks with the built ones",
+    )
+    args = parser.parse_args()
+
+    for name, graph in build_networks().items():
+        print(f"{name}: {len(graph)} nodes, {graph.number_of_edges()} edges")
+        if args.save:
+            save_graph(name, graph)
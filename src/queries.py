@@ -0,0 +1,171 @@
+"""Top-k queries over the stored node metrics of a graph.
+
+``NodeMetrics`` keeps every metric as a NumPy array alongside the node labels
+and the group attributes pages filter by, so a query such as::
+
+    node_metrics(FILM_NETWORK).top_k("degree", 5, genre="Action")
+
+never builds a dict or sorts every node. Without an index ``top_k`` selects
+with ``np.argpartition`` in linear time. With ``index=True`` each metric's
+descending and ascending orders are sorted once up front, and queries slice
+them, scanning only until ``k`` nodes pass the filters. Pass ``lowest=True``
+for the bottom ``k``.
+"""
+import numpy as np
+import pandas as pd
+from centrality import load_metrics
+from datastore import FILM_NETWORK, load_graph, once
+
+# Node attributes ``top_k`` can filter by.
+FILTERS = ["genre", "community", "bo_group"]
+# Positions checked against the filters at a time when scanning an index.
+SCAN_BLOCK = 4096
+
+
+def largest(values, k):
+    """Return the positions of the ``k`` largest ``values``, largest first.
+
+    Ties are broken by position, as a stable sort would.
+
+    Args:
+        values (np.ndarray): The values to rank.
+        k (int): Number of positions returned.
+    """
+    n = len(values)
+    if k >= n:
+        return np.argsort(-values, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = values[np.argpartition(values, n - k)[n - k]]
+    greater = np.flatnonzero(values > kth)
+    equal = np.flatnonzero(values == kth)[: k - len(greater)]
+    top = np.concatenate([greater, equal])
+    return top[np.lexsort((top, -values[top]))]
+
+
+class NodeMetrics:
+    """Node metrics of one graph, queried with ``top_k``.
+
+    Args:
+        nodes (np.ndarray): Node labels.
+        metrics (dict): One array of values per node for each metric.
+        groups (dict): For each filterable attribute, the value or list of
+            values of each node.
+        index (bool): Sort every metric up front for faster queries.
+    """
+
+    def __init__(self, nodes, metrics, groups=None, index=False):
+        self.nodes = np.asarray(nodes)
+        self.metrics = {
+            name: np.asarray(values) for name, values in metrics.items()
+        }
+        self.groups = dict(groups or {})
+        self.order = None
+        if index:
+            self.order = {}
+            for name, values in self.metrics.items():
+                self.order[name, False] = np.argsort(-values, kind="stable")
+                self.order[name, True] = np.argsort(values, kind="stable")
+        self._masks = {}
+
+    @classmethod
+    def from_graph(cls, name=FILM_NETWORK, epsilon=None, index=False):
+        """Return the stored metrics of graph ``name`` with its attributes.
+
+        Args:
+            name (str): One of ``datastore.GRAPHS``.
+            epsilon (float): Betweenness error bound of the stored table.
+            index (bool): Sort every metric up front for faster queries.
+        """
+        metrics = load_metrics(name, epsilon)
+        graph = load_graph(name)
+        groups = {
+            attribute: graph.attribute(attribute)
+            for attribute in FILTERS
+            if attribute in graph.attributes
+        }
+        return cls(
+            metrics.index.to_numpy(),
+            {column: metrics[column].to_numpy() for column in metrics},
+            groups,
+            index,
+        )
+
+    def mask(self, attribute, value):
+        """Return which nodes have ``value`` for ``attribute``.
+
+        List-valued attributes such as genres match nodes whose list holds
+        ``value``. Masks are computed once per value.
+        """
+        key = (attribute, value)
+        if key not in self._masks:
+            if attribute not in self.groups:
+                raise ValueError(
+                    f"Expecting a filter in {list(self.groups)},"
+                    f" but received {attribute}"
+                )
+            values = pd.Series(list(self.groups[attribute]), dtype=object)
+            if values.map(pd.api.types.is_list_like).any():
+                values = values.explode()
+            matches = values.index[(values == value).to_numpy()]
+            mask = np.zeros(len(self.nodes), dtype=bool)
+            mask[matches] = True
+            self._masks[key] = mask
+        return self._masks[key]
+
+    def top_k(self, metric, k=5, lowest=False, **filters):
+        """Return the ``k`` nodes with the highest ``metric``.
+
+        Args:
+            metric (str): One of the stored metrics.
+            k (int): Number of nodes returned.
+            lowest (bool): Return the nodes with the lowest ``metric``
+                instead, lowest first.
+            **filters: Attribute values the nodes must have, for example
+                ``genre="Action"`` or ``community=3``.
+
+        Returns:
+            pd.Series: The metric of the top nodes indexed by node, highest
+            first, ties in node order.
+        """
+        values = self.metrics[metric]
+        ranked = -values if lowest else values
+        mask = None
+        for attribute, value in filters.items():
+            match = self.mask(attribute, value)
+            mask = match if mask is None else mask & match
+
+        if self.order is not None:
+            positions = self._scan(self.order[metric, lowest], mask, k)
+        elif mask is None:
+            positions = largest(ranked, k)
+        else:
+            candidates = np.flatnonzero(mask)
+            positions = candidates[largest(ranked[candidates], k)]
+        return pd.Series(
+            values[positions],
+            index=pd.Index(self.nodes[positions], name="node"),
+            name=metric,
+        )
+
+    @staticmethod
+    def _scan(order, mask, k):
+        """Return the first ``k`` positions of ``order`` within ``mask``."""
+        if mask is None:
+            return order[:k]
+        found = []
+        count = 0
+        for start in range(0, len(order), SCAN_BLOCK):
+            block = order[start : start + SCAN_BLOCK]
+            block = block[mask[block]]
+            found.append(block)
+            count += len(block)
+            if count >= k:
+                break
+        return np.concatenate(found)[:k] if found else order[:0]
+
+
+@once
+def node_metrics(name=FILM_NETWORK, epsilon=None):
+    """Return the indexed ``NodeMetrics`` of graph ``name``."""
+    return NodeMetrics.from_graph(name, epsilon, index=True)
@@ -1,34 +1,78 @@
 import streamlit as st
-import pickle
-import ast
 import numpy as np
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 from constants import BOX_OFFICE_GROUPS
+from artifacts import materialize
+from cache import cached
+from datastore import movie_plots as load_movie_plots, once
+from histograms import grouped_histograms, membership_matrix
 
 
-with open("data/movie_plots", "rb") as f:
-    movie_plots = pickle.load(f)
+@once
+def movie_plots():
+    """Return the genres, sentiment scores and box office group of each plot."""
+    return load_movie_plots(
+        ["genres", "positive", "negative", "neutral", "compound", "bo_groups"]
+    )
+
+
+@once
+def genre_list():
+    """Return the genres of the movie plots, without spaces and sorted."""
+    genres = movie_plots()["genres"].explode().dropna()
+    return np.sort(genres.str.replace(" ", "").unique())
+
+
+SCORE_COLUMNS = {
+    "positivity": "positive",
+    "negativity": "negative",
+    "neutrality": "neutral",
+}
+
+
+def genre_score_histograms(plots, genres, bins=30):
+    """Return histograms of every sentiment score for every genre.
 
-temp = list(set(movie_plots["genres"].values))
-movie_genres = [
-    value for sublist in temp for value in ast.literal_eval(sublist)
-]
-movie_genres_set = list(set(movie_genres))
-genre_list = []
-for genre in movie_genres_set:
-    genre_list.append(genre.replace(" ", ""))
-genre_list = np.sort(list(set(genre_list)))
+    Genre membership is built once as a matrix of exact genre tokens, so
+    "Music" does not also match "Musical", and each score type is then
+    binned for all genres in one pass.
+
+    Args:
+        plots (pd.DataFrame): Movie plots with a ``genres`` column and the
+            score columns in ``SCORE_COLUMNS``.
+        genres (sequence): The genres to plot, without spaces.
+        bins (int): Number of bins per histogram.
+
+    Returns:
+        dict: Maps each key of ``SCORE_COLUMNS`` to a list with a
+        ``(hist, bin_edges)`` pair per genre.
+    """
+    tokens = plots["genres"].map(
+        lambda values: [genre.replace(" ", "") for genre in values]
+    )
+    membership = membership_matrix(tokens, genres)
+    return {
+        type: grouped_histograms(plots[column].to_numpy(), membership, bins)
+        for type, column in SCORE_COLUMNS.items()
+    }
+
+
+@once
+def genre_histograms():
+    """Return ``genre_score_histograms`` of the plotted genres."""
+    return genre_score_histograms(movie_plots(), genre_list()[:-1])
 
 
 # Plots
-@st.cache
+@cached
+@materialize()
 def plot_compound_scores():
     """Returns a figure object of our compound score."""
 
     fig = go.Figure()
 
-    data = np.array(list(movie_plots["compound"].values))
+    data = np.array(list(movie_plots()["compound"].values))
     hist, bins = np.histogram(data, bins=30)
     fig.add_trace(go.Bar(x=bins[:-1], y=hist))
     fig.update_layout(
@@ -39,7 +83,8 @@ def plot_compound_scores():
     return fig
 
 
-@st.cache
+@cached
+@materialize(*({"type": type} for type in SCORE_COLUMNS))
 def plot_sentiment_scores_by_genre(type="positivity", height=800):
     """Returns a figure object of sentiment scores by genre."""
 
@@ -50,20 +95,12 @@ def plot_sentiment_scores_by_genre(type="positivity", height=800):
         )
     fig = make_subplots(rows=10, cols=2, shared_xaxes=True, shared_yaxes=True)
 
-    for i, genre in enumerate(genre_list[:-1]):
-        genre_values = []
-        for index, row in movie_plots.iterrows():
-            if str(genre) in row.genres:
-                if type == "positivity":
-                    genre_values.append(row.positive)
-                elif type == "negativity":
-                    genre_values.append(row.negative)
-                else:
-                    genre_values.append(row.neutral)
-
+    histograms = genre_histograms()[type]
+    for i, (genre, (hist, bins)) in enumerate(
+        zip(genre_list()[:-1], histograms)
+    ):
         b = (i % 2) + 1
         a = (i // 2) + 1
-        hist, bins = np.histogram(genre_values, bins=30)
         fig.add_trace(go.Bar(x=bins[:-1], y=hist, name=genre), a, b)
 
     if type == "positivity":
@@ -87,7 +124,8 @@ def plot_sentiment_scores_by_genre(type="positivity", height=800):
     return fig
 
 
-@st.cache
+@cached
+@materialize(*({"type": type} for type in SCORE_COLUMNS))
 def plot_sentiment_scores_by_box_office_group(
     type="positivity", showlegend=True, height=700
 ):
@@ -103,9 +141,10 @@ def plot_sentiment_scores_by_box_office_group(
         cols=1,
         shared_xaxes=True,
     )
+    plots = movie_plots()
     for i, group in enumerate(BOX_OFFICE_GROUPS):
         j = 1
-        temp_df = movie_plots[movie_plots.bo_groups == group]
+        temp_df = plots[plots.bo_groups == group]
 
         if type == "negativity":
             data = np.array(list(temp_df["negative"].values))
@@ -0,0 +1,474 @@
+"""Generate a synthetic data directory shaped like the real one.
+
+Writes ``dataset.csv`` and ``genres_tf_idf.csv`` for ``scale`` times the
+713 real films to ``DATA_DIR``, along with the store built from them: the
+tables, the ``movie_plots`` sentiment rows, and the film, community and
+actor networks projected from the casts with their ``genre``, ``bo_group``
+and ``community`` node attributes. Genres, box office and cast reuse follow
+the real data, so the networks keep its density as they grow; every actor
+plays in a number of films drawn from a truncated Zipf distribution, like
+the real cast lists where most actors appear once and a few in twenty films.
+
+Films are generated and written ``--chunk`` at a time and the networks are
+projected a block of rows at a time, so only the casts, as integer arrays,
+are ever held in memory whole. The raw ``movie_plots`` pickle cannot be
+written in chunks, so the sentiment rows go straight into the store.
+
+Point ``APP_DATA`` at a new directory to keep the real data untouched::
+
+    APP_DATA=/tmp/films-x10 python src/synthetic.py --scale 10
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import numpy as np
+import pandas as pd
+from constants import BOX_OFFICE_GROUPS
+from datastore import (
+    ACTOR_NETWORK,
+    DATA_DIR,
+    DTYPES,
+    FILM_DATA,
+    FILM_NETWORK,
+    FILM_NETWORK_COMMUNITY,
+    GENRE_TF_IDF,
+    LIST_SEPARATOR,
+    MOVIE_PLOTS,
+    atomic_write,
+    build_tables,
+    count_lists,
+    graph_path,
+    replacing_directory,
+    table_path,
+)
+from projections import projection_blocks
+
+FILMS = 713
+SEED = 0
+CHUNK = 20000
+# Entries copied at a time from scratch files into the stored arrays.
+COPY_BLOCK = 1 << 24
+# Films per genre in the real data, used as sampling weights.
+GENRES = {
+    "Action": 341,
+    "Adventure": 321,
+    "Comedy": 248,
+    "Drama": 200,
+    "Thriller": 194,
+    "Sci-Fi": 169,
+    "Fantasy": 154,
+    "Family": 123,
+    "Crime": 103,
+    "Horror": 90,
+    "Mystery": 89,
+    "Animation": 88,
+    "Romance": 76,
+    "Biography": 17,
+    "Sport": 16,
+    "Musical": 13,
+    "History": 12,
+    "Music": 10,
+    "War": 10,
+    "Documentary": 3,
+    "Western": 3,
+}
+MAX_GENRES = 5
+CAST_SIZE = 7.5
+# Films per actor follow a Zipf distribution with this exponent, truncated
+# at ``MAX_FILMS``.
+ACTOR_EXPONENT = 2.2
+MAX_FILMS = 20
+MEDIAN_BOX_OFFICE = 1.8e8
+BOX_OFFICE_SIGMA = 0.9
+# Films per Louvain community in the real data, used as sampling weights.
+COMMUNITY_SIZES = [112, 103, 85, 77, 59, 50, 48, 41, 36, 32, 23, 18, 9, 3]
+COMMUNITY_SIZES += [1] * 17
+PLOT_WORDS = 60
+VOCABULARY = (
+    "find kill leave attack help return escape save discover plan team"
+    " family friend father mother daughter son city world war secret power"
+    " love home ship planet agent mission town school island battle journey"
+    " monster king dream truth murder heist race treasure"
+).split()
+
+
+def cast_incidence(
+    films,
+    seed=SEED,
+    cast_size=CAST_SIZE,
+    exponent=ACTOR_EXPONENT,
+    max_films=MAX_FILMS,
+):
+    """Return the film x actor incidence matrix of random casts.
+
+    Args:
+        films (int): Number of films.
+        seed (int): Seed for the casts.
+        cast_size (float): Mean number of actors per film.
+        exponent (float): Zipf exponent of the number of films per actor;
+            lower values reuse popular actors more.
+        max_films (int): Most films an actor plays in.
+
+    Returns:
+        csr_matrix: A 1 wherever the actor plays in the film.
+    """
+    from scipy.sparse import csr_matrix
+
+    rng = np.random.default_rng(seed)
+    sizes = np.maximum(rng.poisson(cast_size, films), 1)
+    indptr = np.zeros(films + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    roles = indptr[-1]
+
+    k = np.arange(1, max_films + 1)
+    p = k**-exponent
+    counts = rng.choice(k, size=roles, p=p / p.sum())
+    counts = counts[: np.searchsorted(np.cumsum(counts), roles) + 1]
+    actors = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    rng.shuffle(actors)
+    # The roles left over past the last film are dropped, and with them
+    # any actor who is left without a film.
+    actors = actors[:roles]
+    cast = np.zeros(len(counts), dtype=bool)
+    cast[actors] = True
+    actors = (np.cumsum(cast, dtype=np.int32) - 1)[actors]
+
+    matrix = csr_matrix(
+        (np.ones(roles, dtype=np.int32), actors, indptr),
+        shape=(films, np.count_nonzero(cast)),
+    )
+    # An actor cast twice in a film still links each pair once.
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def _names(prefix, ids):
+    """Return ``prefix`` followed by each of the integer ``ids``."""
+    return np.char.add(prefix, np.asarray(ids).astype(str))
+
+
+def _genres(films, rng):
+    """Return a list of distinct, popularity-weighted genres per film."""
+    names = np.array(list(GENRES))
+    weights = np.array(list(GENRES.values()), dtype=float)
+    # Sorting Gumbel-perturbed log weights samples without replacement.
+    keys = np.log(weights) + rng.gumbel(size=(films, len(names)))
+    order = np.argsort(-keys, axis=1)
+    sizes = 1 + rng.binomial(MAX_GENRES - 1, 0.55, films)
+    return [names[row[:size]].tolist() for row, size in zip(order, sizes)]
+
+
+def _people(prefix, films, mean, pool, rng):
+    """Return lists of about ``mean`` names drawn from ``pool`` people."""
+    sizes = np.maximum(rng.poisson(mean, films), 1)
+    names = _names(prefix, rng.integers(pool, size=sizes.sum()))
+    return [group.tolist() for group in np.split(names, np.cumsum(sizes)[:-1])]
+
+
+def _box_office_groups(box_office):
+    """Return the box office quintile of each film.
+
+    Quintiles of the distribution rather than of the films, so every chunk
+    uses the same bounds.
+    """
+    normal = statistics.NormalDist(np.log(MEDIAN_BOX_OFFICE), BOX_OFFICE_SIGMA)
+    bounds = [normal.inv_cdf(q) for q in (0.2, 0.4, 0.6, 0.8)]
+    return np.array(BOX_OFFICE_GROUPS)[
+        np.searchsorted(bounds, np.log(box_office))
+    ]
+
+
+def film_table(incidence, start=0, stop=None, seed=SEED):
+    """Return rows ``start`` to ``stop`` of a synthetic film table.
+
+    The table has the columns of ``dataset.csv``, with list columns holding
+    real lists as in the ingested table. Rows depend on ``seed`` and
+    ``start``, so a table is reproduced by the same chunks.
+
+    Args:
+        incidence (csr_matrix): The casts, as from ``cast_incidence``.
+        start (int): First film.
+        stop (int): Film after the last; the last film by default.
+        seed (int): Seed for every random column.
+    """
+    stop = incidence.shape[0] if stop is None else stop
+    films = stop - start
+    total = incidence.shape[0]
+    rng = np.random.default_rng([seed, start])
+    titles = _names("Film ", range(start, stop))
+    casts = incidence[start:stop]
+    actors = np.split(_names("Actor", casts.indices), casts.indptr[1:-1])
+    box_office = MEDIAN_BOX_OFFICE * rng.lognormal(0, BOX_OFFICE_SIGMA, films)
+    words = np.array(VOCABULARY, dtype=object)
+    plots = words[rng.integers(len(words), size=(films, PLOT_WORDS))]
+    community_shares = np.array(COMMUNITY_SIZES) / sum(COMMUNITY_SIZES)
+    return pd.DataFrame(
+        {
+            "title": titles,
+            "link": np.char.replace(titles, " ", "_"),
+            "box_office": box_office,
+            "genres": _genres(films, rng),
+            "actors": [cast.tolist() for cast in actors],
+            "directors": _people("Director ", films, 1.2, total, rng),
+            "producers": _people("Producer ", films, 3, total * 2, rng),
+            "writers": _people("Writer ", films, 3, total * 2, rng),
+            "plot": [" ".join(words) for words in plots],
+            "community": rng.choice(
+                len(COMMUNITY_SIZES), size=films, p=community_shares
+            ),
+            "bo_group": _box_office_groups(box_office),
+        },
+        index=pd.RangeIndex(start, stop),
+    )
+
+
+def sentiment_table(table, seed=SEED):
+    """Return random sentiment scores of the films in ``table``.
+
+    The rows match ingested ``movie_plots`` rows, with parsed genres.
+    """
+    rng = np.random.default_rng([seed, table.index[0], 1])
+    n = len(table)
+    return pd.DataFrame(
+        {
+            "title": table["title"],
+            "genres": table["genres"],
+            "positive": rng.uniform(0, 0.3, n),
+            "negative": rng.uniform(0, 0.3, n),
+            "neutral": rng.uniform(0, 1, n),
+            "compound": rng.uniform(-1, 1, n),
+            "bo_groups": table["bo_group"],
+        }
+    )
+
+
+def genre_words(seed=SEED):
+    """Return the top ten words of every genre, as in ``genres_tf_idf``."""
+    rng = np.random.default_rng(seed)
+    rows = [
+        {
+            "Genre": genre,
+            "Top_10_TF": list(rng.choice(VOCABULARY, 10, replace=False)),
+            "Top_10_TF_IDF": list(rng.choice(VOCABULARY, 10, replace=False)),
+        }
+        for genre in sorted(GENRES)
+    ]
+    return pd.DataFrame(rows)
+
+
+class _TableWriter:
+    """Appends chunks of table ``name`` to its Parquet file ``f``."""
+
+    def __init__(self, name, f):
+        self.name = name
+        self.file = f
+        self.writer = None
+
+    def write(self, frame):
+        """Append ``frame``, converted to the table's dtypes."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = frame.astype(DTYPES[self.name])
+        # Chunks share the categories every box office group would have.
+        for column, dtype in DTYPES[self.name].items():
+            if dtype == "category":
+                frame[column] = frame[column].cat.set_categories(
+                    sorted(BOX_OFFICE_GROUPS)
+                )
+        schema = None if self.writer is None else self.writer.schema
+        table = pa.Table.from_pandas(
+            frame, schema=schema, preserve_index=False
+        )
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.file, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        """Finish the file."""
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _array(directory, name, length, dtype):
+    """Return a new ``.npy`` file in ``directory``, mapped to memory."""
+    return np.lib.format.open_memmap(
+        os.path.join(directory, name), mode="w+", dtype=dtype, shape=(length,)
+    )
+
+
+def _write_meta(directory, attributes=(), list_attributes=()):
+    """Write the ``meta.json`` that ``CSRGraph.load`` reads."""
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "attributes": list(attributes),
+                "list_attributes": list(list_attributes),
+            },
+            f,
+        )
+
+
+def _write_adjacency(directory, blocks, nodes):
+    """Write ``indptr.npy`` and ``indices.npy`` from adjacency ``blocks``.
+
+    Each block's indices are appended to a scratch file first, as their
+    total is only known at the end.
+    """
+    indptr = _array(directory, "indptr.npy", nodes + 1, np.int64)
+    indptr[0] = 0
+    scratch = os.path.join(directory, "indices.tmp")
+    row = 0
+    with open(scratch, "wb") as f:
+        for block in blocks:
+            rows = block.shape[0]
+            indptr[row + 1 : row + rows + 1] = indptr[row] + block.indptr[1:]
+            block.indices.astype(np.int32).tofile(f)
+            row += rows
+    indptr.flush()
+
+    written = np.memmap(scratch, dtype=np.int32, mode="r")
+    indices = _array(directory, "indices.npy", len(written), np.int32)
+    for start in range(0, len(written), COPY_BLOCK):
+        indices[start : start + COPY_BLOCK] = written[
+            start : start + COPY_BLOCK
+        ]
+    indices.flush()
+    del written, indices
+    os.remove(scratch)
+
+
+def generate(
+    scale=1,
+    seed=SEED,
+    chunk=CHUNK,
+    cast_size=CAST_SIZE,
+    exponent=ACTOR_EXPONENT,
+    max_films=MAX_FILMS,
+):
+    """Write a synthetic data directory and its store to ``DATA_DIR``.
+
+    Args:
+        scale (float): Number of films as a multiple of the real 713.
+        seed (int): Seed for every random column.
+        chunk (int): Films generated, and network rows projected, at once.
+        cast_size (float): Mean number of actors per film.
+        exponent (float): Zipf exponent of the number of films per actor.
+        max_films (int): Most films an actor plays in.
+
+    Returns:
+        csr_matrix: The film x actor incidence matrix of the casts.
+    """
+    films = round(FILMS * scale)
+    incidence = cast_incidence(films, seed, cast_size, exponent, max_films)
+    title = f"U{len(f'Film_{films}')}"
+    genre = f"U{sum(sorted(map(len, GENRES))[-MAX_GENRES:]) + MAX_GENRES}"
+    group = f"U{max(map(len, BOX_OFFICE_GROUPS))}"
+
+    with contextlib.ExitStack() as stack:
+        csv = stack.enter_context(
+            atomic_write(os.path.join(DATA_DIR, f"{FILM_DATA}.csv"))
+        )
+        writers = {}
+        for name in [FILM_DATA, MOVIE_PLOTS]:
+            f = stack.enter_context(atomic_write(table_path(name), "wb"))
+            writers[name] = _TableWriter(name, f)
+            stack.callback(writers[name].close)
+        film_dir = stack.enter_context(
+            replacing_directory(graph_path(FILM_NETWORK))
+        )
+        link_dir = stack.enter_context(
+            replacing_directory(graph_path(FILM_NETWORK_COMMUNITY))
+        )
+        columns = {
+            "nodes": _array(film_dir, "nodes.npy", films, title),
+            "links": _array(link_dir, "nodes.npy", films, title),
+            "genres": _array(film_dir, "attr.genre.npy", films, genre),
+            "bo_group": _array(film_dir, "attr.bo_group.npy", films, group),
+            "community": _array(
+                film_dir, "attr.community.npy", films, np.int64
+            ),
+        }
+
+        for start in range(0, films, chunk):
+            stop = min(start + chunk, films)
+            table = film_table(incidence, start, stop, seed)
+            table.to_csv(csv, header=start == 0)
+            writers[MOVIE_PLOTS].write(sentiment_table(table, seed))
+            writers[FILM_DATA].write(count_lists(FILM_DATA, table))
+            columns["nodes"][start:stop] = table["title"]
+            columns["links"][start:stop] = table["link"]
+            columns["genres"][start:stop] = table["genres"].map(
+                LIST_SEPARATOR.join
+            )
+            columns["bo_group"][start:stop] = table["bo_group"]
+            columns["community"][start:stop] = table["community"]
+            print(f"{stop} of {films} films")
+        for array in columns.values():
+            array.flush()
+        del columns
+
+        transposed = incidence.T.tocsr()
+        _write_adjacency(
+            film_dir, projection_blocks(incidence, transposed, chunk), films
+        )
+        _write_meta(film_dir, ["genre", "bo_group", "community"], ["genre"])
+        for name in ["indptr.npy", "indices.npy"]:
+            shutil.copyfile(
+                os.path.join(film_dir, name), os.path.join(link_dir, name)
+            )
+        _write_meta(link_dir)
+
+    actors = incidence.shape[1]
+    with replacing_directory(graph_path(ACTOR_NETWORK)) as actor_dir:
+        labels = _array(
+            actor_dir, "nodes.npy", actors, f"U{len(f'Actor{actors}')}"
+        )
+        for start in range(0, actors, chunk):
+            stop = min(start + chunk, actors)
+            labels[start:stop] = _names("Actor", range(start, stop))
+        labels.flush()
+        del labels
+        _write_adjacency(
+            actor_dir, projection_blocks(transposed, incidence, chunk), actors
+        )
+        _write_meta(actor_dir)
+
+    genre_words(seed).to_csv(os.path.join(DATA_DIR, f"{GENRE_TF_IDF}.csv"))
+    build_tables([GENRE_TF_IDF])
+    print(f"{films} films, {actors} actors")
+    return incidence
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument(
+        "--chunk",
+        type=int,
+        default=CHUNK,
+        help="films generated and written at a time",
+    )
+    parser.add_argument("--cast-size", type=float, default=CAST_SIZE)
+    parser.add_argument(
+        "--actor-exponent",
+        type=float,
+        default=ACTOR_EXPONENT,
+        help="Zipf exponent of films per actor; lower reuses actors more",
+    )
+    parser.add_argument("--max-films", type=int, default=MAX_FILMS)
+    args = parser.parse_args()
+
+    generate(
+        args.scale,
+        args.seed,
+        args.chunk,
+        args.cast_size,
+        args.actor_exponent,
+        args.max_films,
+    )
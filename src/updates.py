@@ -0,0 +1,246 @@
+"""Add new films to the store without rebuilding it.
+
+``add_films`` appends a batch of films and their casts to the film table,
+adds each film with an edge to every film it shares an actor with to the
+film network, and adds its actors with an edge between every pair of
+co-stars to the actor network. Existing edges are left as they are, and the
+stored centrality metrics of every connected component the batch did not
+reach are carried over, so only the changed components are measured again.
+The film network's size and mean degree change, so the Erdos-Renyi ensemble
+it is compared with is drawn again. Add the films in a CSV with the film
+table's columns with::
+
+    python src/updates.py new_films.csv
+
+Each batch is recorded in ``data/store/updates.json``. ``data_version``
+hashes the log along with the raw files, so cached results and artifacts
+are recomputed for the new data; rerun ``python src/build.py`` to prebuild
+the page figures for it. Rebuilding the store from the raw files with
+``python src/datastore.py`` discards the added films.
+"""
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+import build
+import centrality
+from datastore import (
+    ACTOR_NETWORK,
+    COUNTED_COLUMNS,
+    DTYPES,
+    FILM_DATA,
+    FILM_NETWORK,
+    LIST_COLUMNS,
+    UPDATES_LOG,
+    _parse_list,
+    atomic_write,
+    data_version,
+    film_data,
+    graph_path,
+    load_graph,
+    save_graph,
+    table_path,
+)
+from projections import FILM_ATTRIBUTES
+
+# Values of the film table's scalar columns that a new film may omit.
+DEFAULTS = {"box_office": np.nan, "plot": "", "community": -1}
+
+
+def film_rows(films):
+    """Return ``films`` as rows of the film table.
+
+    Args:
+        films (pd.DataFrame): One row per film with at least ``title`` and
+            ``actors``, the cast as labelled in the actor network. List
+            columns may hold lists or list literals, and other missing
+            columns are filled in, with ``link`` taken from the title and
+            ``community`` set to -1.
+    """
+    films = pd.DataFrame(films).reset_index(drop=True)
+    missing = {"title", "actors"} - set(films.columns)
+    if missing:
+        raise ValueError(
+            f"Expecting columns {sorted(missing)} in the films to add"
+        )
+    if "link" not in films:
+        films["link"] = films["title"].str.replace(" ", "_")
+    for column, default in DEFAULTS.items():
+        if column not in films:
+            films[column] = default
+    if "bo_group" not in films:
+        films["bo_group"] = None
+    for column in LIST_COLUMNS[FILM_DATA]:
+        if column not in films:
+            films[column] = [[] for _ in range(len(films))]
+        films[column] = films[column].map(
+            lambda v: list(v)
+            if pd.api.types.is_list_like(v)
+            else _parse_list(v)
+        )
+    for column in COUNTED_COLUMNS[FILM_DATA]:
+        films[f"n_{column}"] = films[column].map(len)
+    return films.astype(DTYPES[FILM_DATA])
+
+
+def _cast(films, actors):
+    """Return one (film, actor) row per film and cast member.
+
+    Args:
+        films (pd.Series): The film of each row, or NaN to skip it.
+        actors (pd.Series): The cast of each row.
+    """
+    cast = pd.DataFrame({"film": films, "actor": actors})
+    cast = cast.dropna(subset=["film"]).explode("actor").dropna()
+    return cast.drop_duplicates().astype({"film": np.int64})
+
+
+def _node_values(graph, films):
+    """Return the attribute values of ``films`` as new nodes of ``graph``."""
+    values = {}
+    for name, column in graph.attributes.items():
+        source = films[FILM_ATTRIBUTES.get(name, name)].astype(object)
+        if column.dtype.kind == "U":
+            source = source.where(source.notna(), "")
+        values[name] = source.tolist()
+    return values
+
+
+def add_to_film_network(graph, table, films):
+    """Return the film network with ``films`` added.
+
+    Args:
+        graph (CSRGraph): The film network.
+        table (pd.DataFrame): The film table before the update.
+        films (pd.DataFrame): The new rows of the film table.
+    """
+    nodes = graph.nodes.tolist() + films["title"].tolist()
+    positions = {title: i for i, title in enumerate(nodes)}
+    cast = pd.concat(
+        [
+            _cast(table["title"].map(positions), table["actors"]),
+            _cast(films["title"].map(positions), films["actors"]),
+        ]
+    )
+    # Only edges to a new film are new.
+    pairs = cast[cast["film"] >= len(graph)].merge(
+        cast, on="actor", suffixes=("", "_other")
+    )
+    pairs = pairs[pairs["film"] != pairs["film_other"]]
+    return graph.extend(
+        films["title"].to_numpy(),
+        pairs["film"].to_numpy(),
+        pairs["film_other"].to_numpy(),
+        _node_values(graph, films),
+    )
+
+
+def add_to_actor_network(graph, films):
+    """Return the actor network with the casts of ``films`` added."""
+    known = set(graph.nodes.tolist())
+    actors = films["actors"].explode().dropna()
+    added = [actor for actor in actors.drop_duplicates() if actor not in known]
+    positions = {actor: i for i, actor in enumerate(graph.nodes.tolist())}
+    positions.update((actor, len(graph) + i) for i, actor in enumerate(added))
+    cast = _cast(pd.Series(films.index, index=films.index), films["actors"])
+    cast["actor"] = cast["actor"].map(positions)
+    pairs = cast.merge(cast, on="film", suffixes=("", "_other"))
+    pairs = pairs[pairs["actor"] < pairs["actor_other"]]
+    return graph.extend(
+        np.asarray(added, dtype=str),
+        pairs["actor"].to_numpy(),
+        pairs["actor_other"].to_numpy(),
+        {name: [] for name in graph.attributes},
+    )
+
+
+def changed_nodes(previous, graph):
+    """Return the positions of nodes added or given edges by an update."""
+    n_old = len(previous)
+    grown = np.flatnonzero(graph.degrees[:n_old] != previous.degrees)
+    return np.concatenate([grown, np.arange(n_old, len(graph))])
+
+
+def add_films(films, processes=None):
+    """Add ``films`` to the film table and the film and actor networks.
+
+    Args:
+        films (pd.DataFrame): The films to add, see ``film_rows``.
+        processes (int): Worker processes for the metrics of changed
+            components and the Erdos-Renyi ensemble.
+
+    Returns:
+        dict: For each network, the labels of the nodes that were added or
+        gained edges.
+    """
+    paths = [table_path(FILM_DATA)]
+    paths += [graph_path(name) for name in (FILM_NETWORK, ACTOR_NETWORK)]
+    if not all(os.path.exists(path) for path in paths):
+        raise FileNotFoundError(
+            "Build the store with `python src/datastore.py` before adding"
+            " films"
+        )
+    # Record the current version, so the call after the update reloads.
+    data_version()
+    films = film_rows(films)
+    table = film_data()
+    titles = films["title"]
+    repeated = titles[titles.duplicated() | titles.isin(table["title"])]
+    if len(repeated):
+        raise ValueError(f"Films already in the dataset: {list(repeated)}")
+    films.index += len(table)
+
+    previous = {
+        name: load_graph(name) for name in (FILM_NETWORK, ACTOR_NETWORK)
+    }
+    graphs = {
+        FILM_NETWORK: add_to_film_network(
+            previous[FILM_NETWORK], table, films
+        ),
+        ACTOR_NETWORK: add_to_actor_network(previous[ACTOR_NETWORK], films),
+    }
+    changed = {}
+    for name, graph in graphs.items():
+        positions = changed_nodes(previous[name], graph)
+        centrality.update_metrics(
+            name, previous[name], graph, positions, processes
+        )
+        changed[name] = graph.nodes[positions].tolist()
+
+    for name, graph in graphs.items():
+        save_graph(name, graph)
+    updated = pd.concat([table, films[table.columns]])
+    with atomic_write(table_path(FILM_DATA), "wb") as f:
+        updated.astype(DTYPES[FILM_DATA]).to_parquet(f, index=False)
+
+    log = {"batches": []}
+    if os.path.exists(UPDATES_LOG):
+        with open(UPDATES_LOG) as f:
+            log = json.load(f)
+    log["batches"].append(
+        {
+            "films": titles.tolist(),
+            "graphs": {
+                name: graph.content_hash() for name, graph in graphs.items()
+            },
+        }
+    )
+    with atomic_write(UPDATES_LOG) as f:
+        json.dump(log, f, indent=1)
+    # Drop everything cached from the previous version.
+    data_version()
+    build.build_ensemble(processes=processes)
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("films", help="CSV file of the films to add")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    changed = add_films(pd.read_csv(args.films), args.processes)
+    for name, nodes in changed.items():
+        print(f"{name}: {len(nodes)} nodes added or changed")
+    print("Prebuild the figures for the new data with python src/build.py")
@@ -1,21 +1,34 @@
 import streamlit as st
-from constants import GENRE_TF_IDF_DATA
-import ast
+from artifacts import materialize
+from cache import cached
+from datastore import genre_tf_idf_data
+
+
+@cached
+@materialize({"column": "Top_10_TF"}, {"column": "Top_10_TF_IDF"})
+def genre_top_words(column):
+    """Return a ``[genre, words]`` pair for each of the first 13 genres.
+
+    Args:
+        column (str): ``"Top_10_TF"`` or ``"Top_10_TF_IDF"``.
+    """
+    genre_tf_idf = genre_tf_idf_data(["Genre", column]).head(13)
+    return [
+        [genre, ", ".join(words)]
+        for genre, words in zip(genre_tf_idf["Genre"], genre_tf_idf[column])
+    ]
+
 
 def render_genre_tf_idf():
     st.text("")
     st.write(f"### Top 10 words according to TF:")
-    for index, row in GENRE_TF_IDF_DATA.head(13).iterrows():
-        li = ast.literal_eval(row.Top_10_TF)
-        words = ', '.join(li)
-        st.write(f"**{row.Genre}** : {words}")
+    for genre, words in genre_top_words("Top_10_TF"):
+        st.write(f"**{genre}** : {words}")
 
     st.text("")
     st.write(f"### Top 10 words according to TF-IDF:")
-    for index, row in GENRE_TF_IDF_DATA.head(13).iterrows():
-        li = ast.literal_eval(row.Top_10_TF_IDF)
-        words = ', '.join(li)
-        st.write(f"**{row.Genre}** : {words}")
+    for genre, words in genre_top_words("Top_10_TF_IDF"):
+        st.write(f"**{genre}** : {words}")
 
 def render_word_clouds():
     """Renders wordclouds on the page."""